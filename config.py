@@ -1,11 +1,16 @@
 # config.py
+from functools import cached_property, lru_cache
 from pathlib import Path
 
+from dotenv import load_dotenv
 from pydantic import Field, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Директория проекта (resolve() выполняется один раз при импорте)
+_CONFIG_DIR = Path(__file__).resolve().parent
+
 # Ищем .env в той же директории, где лежит этот файл
-ENV_FILE_PATH = Path(__file__).resolve().parent / ".env"
+ENV_FILE_PATH = _CONFIG_DIR / ".env"
 
 
 class ProxyConfig(BaseSettings):
@@ -16,8 +21,6 @@ class ProxyConfig(BaseSettings):
     """
     model_config = SettingsConfigDict(
         env_prefix="PROXY_",
-        env_file=ENV_FILE_PATH,
-        env_file_encoding="utf-8",
         extra="ignore",  # Игнорировать лишние переменные окружения
     )
 
@@ -26,16 +29,18 @@ class ProxyConfig(BaseSettings):
     proxies_file: str = Field(...)
     valid_proxies_file: str = Field(...)
 
-    # --- Вычисляемые пути ---
-    @property
+    # --- Вычисляемые пути (кэшируются при первом обращении) ---
+    @computed_field
+    @cached_property
     def proxies_file_path(self) -> Path:
         """Полный путь к файлу с новыми прокси."""
-        return Path(__file__).resolve().parent / self.proxies_file
+        return _CONFIG_DIR / self.proxies_file
 
-    @property
+    @computed_field
+    @cached_property
     def valid_proxies_file_path(self) -> Path:
         """Полный путь к файлу с валидными прокси."""
-        return Path(__file__).resolve().parent / self.valid_proxies_file
+        return _CONFIG_DIR / self.valid_proxies_file
 
 
 class PostgresConfig(BaseSettings):
@@ -44,8 +49,6 @@ class PostgresConfig(BaseSettings):
     """
     model_config = SettingsConfigDict(
         env_prefix="PG_",
-        env_file=ENV_FILE_PATH,
-        env_file_encoding="utf-8",
         extra="ignore",
     )
 
@@ -64,8 +67,14 @@ class PostgresConfig(BaseSettings):
     # --- Timeouts ---
     connect_timeout: int = Field(default=10, description="Connection timeout in seconds")
 
+    # --- Prepared statements ---
+    prepare_threshold: int | None = Field(
+        default=0,
+        description="Executions of a query before psycopg prepares it server-side (0 = at once, None = never)",
+    )
+
     @computed_field
-    @property
+    @cached_property
     def connection_url(self) -> str:
         """
         Connection URL для psycopg.
@@ -76,7 +85,7 @@ class PostgresConfig(BaseSettings):
             f"{self.host}:{self.port}/{self.db}"
         )
     
-    @property
+    @cached_property
     def connection_kwargs(self) -> dict:
         """
         Параметры подключения как словарь.
@@ -90,6 +99,7 @@ class PostgresConfig(BaseSettings):
             "password": self.password,
             "connect_timeout": self.connect_timeout,
             "options": f"-c search_path={self.db_schema}",  # 👈 используем схему
+            "prepare_threshold": self.prepare_threshold,
         }
 
 class Settings(BaseSettings):
@@ -97,8 +107,6 @@ class Settings(BaseSettings):
     Top-level application settings aggregating sub-configs.
     """
     model_config = SettingsConfigDict(
-        env_file=ENV_FILE_PATH,
-        env_file_encoding="utf-8",
         extra="ignore",
     )
 
@@ -106,5 +114,15 @@ class Settings(BaseSettings):
     pg: PostgresConfig = Field(default_factory=PostgresConfig)
 
 
-# Глобальный экземпляр настроек, используемый во всем приложении
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Application settings, built on first call and shared afterwards.
+
+    .env is parsed only once per process, into os.environ (variables that
+    are already set take precedence), so the settings classes only read
+    the environment. Call get_settings.cache_clear() to force a reload
+    (e.g. in tests).
+    """
+    load_dotenv(ENV_FILE_PATH, encoding="utf-8", override=False)
+    return Settings()
@@ -32,6 +32,7 @@ Usage examples:
 from __future__ import annotations
 
 import logging
+import threading
 from contextlib import contextmanager
 from typing import TYPE_CHECKING, Generator
 
@@ -39,10 +40,11 @@ import psycopg
 from psycopg.rows import dict_row
 from psycopg_pool import ConnectionPool
 
-from config import settings
+from config import get_settings
 
 if TYPE_CHECKING:
     from psycopg import Connection, Cursor
+    from psycopg.rows import RowFactory
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +53,7 @@ logger = logging.getLogger(__name__)
 # -----------------------------------------------------------------------------
 
 _pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
 
 
 # --- Функция _configure_connection больше не нужна и была удалена ---
@@ -62,14 +65,15 @@ _pool: ConnectionPool | None = None
 #     """
 #     schema = settings.pg.db_schema
 #     conn.execute(f"SET search_path TO {schema}")
-#     logger.debug(f"Connection configured: search_path set to '{schema}'")
+#     logger.debug("Connection configured: search_path set to '%s'", schema)
 
 
 def get_pool() -> ConnectionPool:
     """
     Get or create connection pool.
     
-    Pool is created on first call (lazy initialization).
+    Pool is created on first call (lazy initialization), under a lock
+    so that concurrent first calls cannot create two pools.
     All subsequent calls return the same pool instance.
     
     Returns:
@@ -77,28 +81,35 @@ def get_pool() -> ConnectionPool:
     """
     global _pool
     
-    if _pool is None:
-        logger.info(
-            f"Initializing connection pool: "
-            f"{settings.pg.host}:{settings.pg.port}/{settings.pg.db} "
-            f"(min={settings.pg.pool_min_size}, max={settings.pg.pool_max_size})"
-        )
-        
-        _pool = ConnectionPool(
-            conninfo=settings.pg.connection_url,
-            min_size=settings.pg.pool_min_size,
-            max_size=settings.pg.pool_max_size,
-            # --- ИЗМЕНЕНИЕ: Удален configure и добавлен options в kwargs ---
-            kwargs={
-                "row_factory": dict_row,
-                "connect_timeout": settings.pg.connect_timeout,
-                "options": f"-c search_path={settings.pg.db_schema}",
-            },
-        )
-        
-        # Wait for pool to be ready (optional)
-        _pool.wait()
-        logger.info("Connection pool initialized successfully")
+    # Fast path without locking once the pool exists
+    if _pool is not None:
+        return _pool
+    
+    with _pool_lock:
+        # Another thread may have created the pool while we were waiting
+        if _pool is None:
+            pg = get_settings().pg
+            logger.info(
+                "Initializing connection pool: %s:%s/%s (min=%s, max=%s)",
+                pg.host, pg.port, pg.db, pg.pool_min_size, pg.pool_max_size,
+            )
+            
+            _pool = ConnectionPool(
+                conninfo=pg.connection_url,
+                min_size=pg.pool_min_size,
+                max_size=pg.pool_max_size,
+                # --- ИЗМЕНЕНИЕ: Удален configure и добавлен options в kwargs ---
+                kwargs={
+                    "row_factory": dict_row,
+                    "connect_timeout": pg.connect_timeout,
+                    "options": f"-c search_path={pg.db_schema}",
+                    "prepare_threshold": pg.prepare_threshold,
+                },
+            )
+            
+            # Wait for pool to be ready (optional)
+            _pool.wait()
+            logger.info("Connection pool initialized successfully")
     
     return _pool
 
@@ -111,11 +122,15 @@ def close_pool() -> None:
     """
     global _pool
     
-    if _pool is not None:
+    with _pool_lock:
+        if _pool is None:
+            return
+        
         logger.info("Closing connection pool...")
         _pool.close()
         _pool = None
-        logger.info("Connection pool closed")
+    
+    logger.info("Connection pool closed")
 
 
 def get_pool_stats() -> dict | None:
@@ -125,15 +140,17 @@ def get_pool_stats() -> dict | None:
     Returns:
         dict with pool information or None if pool is not initialized.
     """
-    if _pool is None:
+    pool = _pool
+    if pool is None:
         return None
     
+    stats = pool.get_stats()
     return {
-        "min_size": _pool.min_size,
-        "max_size": _pool.max_size,
-        "size": _pool.get_stats().get("pool_size", 0),
-        "available": _pool.get_stats().get("pool_available", 0),
-        "requests_waiting": _pool.get_stats().get("requests_waiting", 0),
+        "min_size": pool.min_size,
+        "max_size": pool.max_size,
+        "size": stats.get("pool_size", 0),
+        "available": stats.get("pool_available", 0),
+        "requests_waiting": stats.get("requests_waiting", 0),
     }
 
 
@@ -165,13 +182,19 @@ def get_connection() -> Generator[Connection, None, None]:
 
 
 @contextmanager
-def get_cursor(*, autocommit: bool = True) -> Generator[Cursor, None, None]:
+def get_cursor(
+    *, 
+    autocommit: bool = True,
+    row_factory: RowFactory | None = None,
+) -> Generator[Cursor, None, None]:
     """
     Context manager providing connection and cursor.
     
     Args:
         autocommit: If True (default), commits on successful context exit.
                     On exception, performs rollback.
+        row_factory: Row factory for this cursor only (e.g. tuple_row for
+                     hot paths). Defaults to the pool's dict_row.
     
     Yields:
         Cursor: psycopg cursor.
@@ -187,7 +210,7 @@ def get_cursor(*, autocommit: bool = True) -> Generator[Cursor, None, None]:
             # no commit (read-only)
     """
     with get_connection() as conn:
-        with conn.cursor() as cur:
+        with conn.cursor(row_factory=row_factory) as cur:
             try:
                 yield cur
                 if autocommit:
@@ -198,13 +221,19 @@ def get_cursor(*, autocommit: bool = True) -> Generator[Cursor, None, None]:
 
 
 @contextmanager
-def transaction() -> Generator[Cursor, None, None]:
+def transaction(
+    *, 
+    row_factory: RowFactory | None = None,
+) -> Generator[Cursor, None, None]:
     """
     Context manager for explicit transaction handling.
     
     Commit is performed only on successful exit.
     Any exception triggers rollback.
     
+    Args:
+        row_factory: Row factory for this cursor only (see get_cursor).
+    
     Yields:
         Cursor: psycopg cursor within a transaction.
     
@@ -216,7 +245,7 @@ def transaction() -> Generator[Cursor, None, None]:
     """
     with get_connection() as conn:
         with conn.transaction():  # BEGIN ... COMMIT/ROLLBACK
-            with conn.cursor() as cur:
+            with conn.cursor(row_factory=row_factory) as cur:
                 yield cur
 
 
@@ -252,21 +281,16 @@ def get_simple_connection(
                 print(cur.fetchone())
             conn.commit()
     """
+    pg = get_settings().pg
     row_factory = dict_row if use_dict_row else None
     
     conn = psycopg.connect(
-        host=settings.pg.host,
-        port=settings.pg.port,
-        dbname=settings.pg.db,
-        user=settings.pg.user,
-        password=settings.pg.password,
-        connect_timeout=settings.pg.connect_timeout,
-        options=f"-c search_path={settings.pg.db_schema}",
+        **pg.connection_kwargs,
         row_factory=row_factory,
         autocommit=autocommit,
     )
     
-    logger.debug(f"Simple connection opened to {settings.pg.host}:{settings.pg.port}/{settings.pg.db}")
+    logger.debug("Simple connection opened to %s:%s/%s", pg.host, pg.port, pg.db)
     
     try:
         yield conn
@@ -298,7 +322,7 @@ def check_connection() -> bool:
                 cur.execute("SELECT 1")
                 return cur.fetchone() is not None
     except Exception as e:
-        logger.error(f"Database connection check failed: {e}")
+        logger.error("Database connection check failed: %s", e)
         return False
 
 
@@ -316,5 +340,5 @@ def get_server_version() -> str | None:
                 result = cur.fetchone()
                 return result["version"] if result else None
     except Exception as e:
-        logger.error(f"Failed to get server version: {e}")
+        logger.error("Failed to get server version: %s", e)
         return None
\ No newline at end of file
@@ -1,12 +1,16 @@
 # database\loader.py
 
-import json
 import logging
-import os
 import sys
-from datetime import datetime, timezone
+from collections import Counter
+from datetime import UTC, datetime
+from itertools import chain
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, TypedDict
+
+import orjson
+from psycopg.rows import tuple_row
+from pydantic import TypeAdapter, ValidationError
 
 # Add the project root directory to sys.path
 project_root = Path(__file__).resolve().parent.parent
@@ -15,6 +19,167 @@ sys.path.append(str(project_root))
 # Import only the necessary utility
 from database.connection import check_connection, close_pool
 
+logger = logging.getLogger(__name__)
+
+
+# --- Input file schema ---
+# Only the presence of the keys is required, values are checked by the database
+class ResultItem(TypedDict):
+    """Keys every result (game) item of an input file must have."""
+    game_src_id: Any
+    game_ts: Any
+    game_end: Any
+    home_src_id: Any
+    away_src_id: Any
+
+
+class TournamentItem(TypedDict):
+    """Keys every tournament item of an input file must have."""
+    area_src_id: Any
+    area_name: Any
+    tourney_src_id: Any
+    tourney_name: Any
+    results: list[ResultItem]
+
+
+# Validator compiled once by pydantic-core: checks the parsed file in one pass
+INPUT_FILE_ADAPTER = TypeAdapter(list[TournamentItem])
+
+# Operations counted per entity, in the shape of the statistics returned by the loaders
+UPDATE_STATS_SHAPE = {
+    'areas': ('created', 'updated'),
+    'tournaments': ('created', 'updated'),
+    'teams': ('created', 'updated'),
+    'tournament_teams_links': ('created',),
+    'games': ('created', 'updated'),
+}
+INSERT_ONLY_STATS_SHAPE = {
+    'areas': ('created', 'skipped'),
+    'tournaments': ('created', 'skipped'),
+    'teams': ('created', 'skipped'),
+    'tournament_teams_links': ('created',),
+    'games': ('created', 'skipped'),
+}
+
+# Games of a tournament are loaded with COPY starting from this many rows
+COPY_GAMES_MIN_ROWS = 500
+
+# PostgreSQL accepts at most this many bind parameters in one statement
+MAX_QUERY_PARAMS = 65535
+
+# Binary COPY column types of games, in collect_game_rows() order
+GAME_COPY_TYPES = ['varchar', 'int4', 'int4', 'int4', 'timestamptz', 'varchar'] + ['int2'] * 14
+
+# A file load is one re-runnable transaction: its commit does not have to wait
+# for the WAL flush (a crash may lose the load, but never corrupts data)
+SQL_LOAD_SETTINGS = "SET LOCAL synchronous_commit = off"
+
+# --- SQL statements of the tournament level ---
+# Statements executed once per tournament are prepared explicitly (prepare=True),
+# independently of the connection's prepare_threshold
+SQL_UPSERT_AREA = """INSERT INTO areas (src_id, name) VALUES (%s, %s)
+    ON CONFLICT (src_id) DO UPDATE SET name = EXCLUDED.name, updated_at = NOW()
+    RETURNING id, (xmax = 0) AS inserted"""
+
+SQL_UPSERT_TOURNAMENT = """INSERT INTO tournaments
+    (src_id, area_id, name, code, url, logo, status)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (src_id) DO UPDATE SET
+    area_id = EXCLUDED.area_id, name = EXCLUDED.name, code = EXCLUDED.code,
+    url = EXCLUDED.url, logo = EXCLUDED.logo, status = EXCLUDED.status,
+    updated_at = NOW()
+    RETURNING id, (xmax = 0) AS inserted"""
+
+SQL_INSERT_AREA = """INSERT INTO areas (src_id, name) VALUES (%s, %s)
+    ON CONFLICT (src_id) DO NOTHING RETURNING id"""
+
+SQL_SELECT_AREA_ID = "SELECT id FROM areas WHERE src_id = %s"
+
+SQL_INSERT_TOURNAMENT = """INSERT INTO tournaments
+    (src_id, area_id, name, code, url, logo, status)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (src_id) DO NOTHING RETURNING id"""
+
+SQL_SELECT_TOURNAMENT_ID = "SELECT id FROM tournaments WHERE src_id = %s"
+
+# --- SQL statements of the games level ---
+# Built once at import: psycopg caches prepared statements by query text,
+# so every call with the same constant reuses one server-side plan.
+GAME_COLUMN_NAMES = """src_id, tournament_id, home_team_id, away_team_id,
+    game_ts, game_end, home_score, away_score,
+    home_q1, home_q2, home_q3, home_q4,
+    home_ot1, home_ot2, away_q1, away_q2,
+    away_q3, away_q4, away_ot1, away_ot2"""
+GAME_COLUMNS = f"({GAME_COLUMN_NAMES})"
+
+GAME_ON_CONFLICT_UPDATE = """ON CONFLICT (src_id) DO UPDATE SET
+    tournament_id = EXCLUDED.tournament_id, home_team_id = EXCLUDED.home_team_id,
+    away_team_id = EXCLUDED.away_team_id, game_ts = EXCLUDED.game_ts,
+    game_end = EXCLUDED.game_end, home_score = EXCLUDED.home_score,
+    away_score = EXCLUDED.away_score, home_q1 = EXCLUDED.home_q1,
+    home_q2 = EXCLUDED.home_q2, home_q3 = EXCLUDED.home_q3,
+    home_q4 = EXCLUDED.home_q4, home_ot1 = EXCLUDED.home_ot1,
+    home_ot2 = EXCLUDED.home_ot2, away_q1 = EXCLUDED.away_q1,
+    away_q2 = EXCLUDED.away_q2, away_q3 = EXCLUDED.away_q3,
+    away_q4 = EXCLUDED.away_q4, away_ot1 = EXCLUDED.away_ot1,
+    away_ot2 = EXCLUDED.away_ot2, updated_at = NOW()"""
+
+SQL_UPSERT_TEAM = """INSERT INTO teams (src_id, name, slug, abbr, logo)
+    VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT (src_id) DO UPDATE SET
+    name = EXCLUDED.name, slug = EXCLUDED.slug, abbr = EXCLUDED.abbr,
+    logo = EXCLUDED.logo, updated_at = NOW()
+    RETURNING id, src_id, (xmax = 0) AS inserted"""
+
+SQL_INSERT_TEAMS_HEAD = "INSERT INTO teams (src_id, name, slug, abbr, logo)"
+SQL_INSERT_TEAMS_TAIL = "ON CONFLICT (src_id) DO NOTHING RETURNING id, src_id"
+
+SQL_SELECT_TEAM_ID = "SELECT id FROM teams WHERE src_id = %s"
+
+SQL_SELECT_TOURNAMENT_LINKS = """SELECT t.src_id, tt.team_id
+    FROM tournament_teams tt JOIN tournaments t ON t.id = tt.tournament_id
+    WHERE t.src_id = ANY(%s)"""
+
+SQL_INSERT_TOURNAMENT_TEAM = (
+    "INSERT INTO tournament_teams (tournament_id, team_id) VALUES (%s, %s) ON CONFLICT DO NOTHING"
+)
+
+SQL_UPSERT_GAME = f"""INSERT INTO games
+    {GAME_COLUMNS}
+    VALUES ({', '.join(['%s'] * 20)})
+    {GAME_ON_CONFLICT_UPDATE}
+    RETURNING (xmax = 0) AS inserted"""
+
+SQL_INSERT_GAMES_HEAD = f"""INSERT INTO games
+    {GAME_COLUMNS}"""
+SQL_INSERT_GAMES_TAIL = "ON CONFLICT (src_id) DO NOTHING RETURNING src_id"
+
+# Staging table for merging large game batches, dropped with the transaction
+SQL_CREATE_GAMES_STAGE = f"""CREATE TEMP TABLE IF NOT EXISTS games_stage ON COMMIT DROP AS
+    SELECT {GAME_COLUMN_NAMES} FROM games WITH NO DATA"""
+
+SQL_TRUNCATE_GAMES_STAGE = "TRUNCATE games_stage"
+
+SQL_COPY_GAMES_STAGE = f"""COPY games_stage
+    {GAME_COLUMNS}
+    FROM STDIN (FORMAT BINARY)"""
+
+SQL_MERGE_GAMES_STAGE = f"""WITH merged AS (
+    INSERT INTO games {GAME_COLUMNS}
+    SELECT {GAME_COLUMN_NAMES} FROM games_stage
+    {GAME_ON_CONFLICT_UPDATE}
+    RETURNING (xmax = 0) AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted) FROM merged"""
+
+SQL_INSERT_GAMES_STAGE = f"""WITH inserted AS (
+    INSERT INTO games {GAME_COLUMNS}
+    SELECT {GAME_COLUMN_NAMES} FROM games_stage
+    ON CONFLICT (src_id) DO NOTHING
+    RETURNING 1
+    )
+    SELECT count(*) FROM inserted"""
+
 # --- Logging Setup ---
 def setup_logging():
     """Sets up logging to a file in the 'logs' directory."""
@@ -36,315 +201,458 @@ def setup_logging():
 
 def convert_unix_timestamp(unix_ts: int) -> datetime:
     """Converts a Unix timestamp to a datetime object with UTC timezone."""
-    return datetime.fromtimestamp(unix_ts, tz=timezone.utc)
+    return datetime.fromtimestamp(unix_ts, UTC)
 
 def validate_json_file(file_path: str) -> bool:
-    """Checks for file existence and validates JSON structure."""
-    if not os.path.exists(file_path):
-        return False
+    """Checks for file existence and validates JSON structure (see read_json_file)."""
+    return read_json_file(file_path) is not None
+
+def nest_stats(counts: Counter, shape: dict) -> dict:
+    """
+    Converts flat statistics {(entity, operation): count} to the nested
+    {entity: {operation: count}} dict returned by the loaders.
+    """
+    return {
+        entity: {operation: counts[entity, operation] for operation in operations}
+        for entity, operations in shape.items()
+    }
+
+def read_json_file(file_path: str | Path) -> list | None:
+    """
+    Reads and validates an input file, reading and parsing it only once.
     
+    Returns:
+        list: Tournaments of the file, or None if it is missing or invalid
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-            if not isinstance(data, list):
-                return False
-            
-            required_fields = ['area_src_id', 'area_name', 'tourney_src_id', 'tourney_name', 'results']
-            for item in data:
-                for field in required_fields:
-                    if field not in item:
-                        return False
-                
-                result_required_fields = ['game_src_id', 'game_ts', 'game_end', 'home_src_id', 'away_src_id']
-                for result in item['results']:
-                    for field in result_required_fields:
-                        if field not in result:
-                            return False
-            
-            return True
-    except json.JSONDecodeError:
-        return False
+        raw = Path(file_path).read_bytes()
+    except FileNotFoundError:
+        return None
+    
+    try:
+        # orjson rejects NaN/Infinity, which the loader could not store anyway
+        data = orjson.loads(raw)
+        INPUT_FILE_ADAPTER.validate_python(data)
+    except (orjson.JSONDecodeError, ValidationError):
+        return None
+    
+    return data
 
-# =============================================================================
-# LEVEL 3: Process single game
-# =============================================================================
+def prefetch_ids(cur, table: str, src_ids: set) -> dict:
+    """
+    Loads the ids of the rows of a table that already exist, with one query.
+    
+    Args:
+        cur: Active database cursor
+        table: Table with src_id and id columns (areas, tournaments, teams)
+        src_ids: Source ids to look up
+    
+    Returns:
+        dict: {src_id: id} of the existing rows
+    """
+    cur.execute(f"SELECT src_id, id FROM {table} WHERE src_id = ANY(%s)", (list(src_ids),))
+    return dict(cur.fetchall())
 
-def process_game_with_update(
-    cur, 
-    game_data: dict, 
-    tourney_id: int, 
-    teams_cache: dict, 
-    current_tournament_team_links: set
-) -> dict:
+
+def prefetch_tournament_links(cur, data: list) -> dict:
     """
-    Processes a single game with UPDATE for existing records.
+    Loads the teams already linked to the tournaments of a file, with one query.
     
     Args:
         cur: Active database cursor
-        game_data: Single game data from results array
-        tourney_id: Tournament ID in database
-        teams_cache: Cache dict {team_src_id: team_db_id}
-        current_tournament_team_links: Set of (tournament_id, team_id) tuples
+        data: Tournaments of the input file
+    
+    Returns:
+        dict: {tourney_src_id: set of linked team ids}
+    """
+    cur.execute(SQL_SELECT_TOURNAMENT_LINKS, ([t['tourney_src_id'] for t in data],))
+    
+    links = {}
+    for tourney_src_id, team_id in cur.fetchall():
+        links.setdefault(tourney_src_id, set()).add(team_id)
+    return links
+
+
+def prefetch_existing_ids(cur, data: list) -> dict:
+    """
+    Prefetches ids of the areas, tournaments and teams of a file that already exist,
+    and the existing tournament-team links.
+    
+    Args:
+        cur: Active database cursor
+        data: Tournaments of the input file
     
     Returns:
-        dict: Statistics of operations performed
+        dict: {'areas' | 'tournaments' | 'teams': {src_id: id},
+               'tournament_teams': {tourney_src_id: set of team ids}}
     """
-    stats = {
-        'teams': {'created': 0, 'updated': 0},
-        'tournament_teams_links': {'created': 0},
-        'games': {'created': 0, 'updated': 0}
+    team_src_ids = set()
+    for tournament_data in data:
+        for game_data in tournament_data['results']:
+            team_src_ids.add(game_data['home_src_id'])
+            team_src_ids.add(game_data['away_src_id'])
+    
+    return {
+        'areas': prefetch_ids(cur, 'areas', {t['area_src_id'] for t in data}),
+        'tournaments': prefetch_ids(cur, 'tournaments', {t['tourney_src_id'] for t in data}),
+        'teams': prefetch_ids(cur, 'teams', team_src_ids),
+        'tournament_teams': prefetch_tournament_links(cur, data),
     }
+
+# =============================================================================
+# LEVEL 3: Process games
+# =============================================================================
+
+def collect_team_rows(games: list, teams_cache: dict) -> list:
+    """
+    Collects team rows that are not cached yet from a list of games.
     
-    # Process Home Team
-    home_src_id = game_data['home_src_id']
-    if home_src_id not in teams_cache:
-        cur.execute("SELECT id FROM teams WHERE src_id = %s", (home_src_id,))
-        result = cur.fetchone()
-        
-        if result:
-            home_team_id = result['id']
-            cur.execute(
-                """UPDATE teams SET name = %s, slug = %s, abbr = %s, logo = %s, updated_at = NOW() WHERE id = %s""",
-                (game_data.get('home_name'), game_data.get('home_slug'), 
-                 game_data.get('home_abbr'), game_data.get('home_logo'), home_team_id)
-            )
-            stats['teams']['updated'] += 1
-        else:
-            cur.execute(
-                """INSERT INTO teams (src_id, name, slug, abbr, logo) 
-                   VALUES (%s, %s, %s, %s, %s) RETURNING id""",
-                (home_src_id, game_data.get('home_name'), game_data.get('home_slug'), 
-                 game_data.get('home_abbr'), game_data.get('home_logo'))
+    Each team is taken only once, from its first occurrence in the list.
+    
+    Args:
+        games: Games data from results array
+        teams_cache: Cache dict {team_src_id: team_db_id}
+    
+    Returns:
+        list: Tuples (src_id, name, slug, abbr, logo)
+    """
+    team_rows = {}
+    
+    for game_data in games:
+        home_src_id = game_data['home_src_id']
+        if home_src_id not in teams_cache and home_src_id not in team_rows:
+            team_rows[home_src_id] = (
+                home_src_id, game_data.get('home_name'), game_data.get('home_slug'),
+                game_data.get('home_abbr'), game_data.get('home_logo')
             )
-            home_team_id = cur.fetchone()['id']
-            stats['teams']['created'] += 1
         
-        teams_cache[home_src_id] = home_team_id
-    else:
-        home_team_id = teams_cache[home_src_id]
-
-    # Create tournament-team link for home team
-    if (tourney_id, home_team_id) not in current_tournament_team_links:
-        cur.execute(
-            "INSERT INTO tournament_teams (tournament_id, team_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-            (tourney_id, home_team_id)
-        )
-        if cur.rowcount > 0:
-            stats['tournament_teams_links']['created'] += 1
-        current_tournament_team_links.add((tourney_id, home_team_id))
-
-    # Process Away Team
-    away_src_id = game_data['away_src_id']
-    if away_src_id not in teams_cache:
-        cur.execute("SELECT id FROM teams WHERE src_id = %s", (away_src_id,))
-        result = cur.fetchone()
-        
-        if result:
-            away_team_id = result['id']
-            cur.execute(
-                """UPDATE teams SET name = %s, slug = %s, abbr = %s, logo = %s, updated_at = NOW() WHERE id = %s""",
-                (game_data.get('away_name'), game_data.get('away_slug'), 
-                 game_data.get('away_abbr'), game_data.get('away_logo'), away_team_id)
-            )
-            stats['teams']['updated'] += 1
-        else:
-            cur.execute(
-                """INSERT INTO teams (src_id, name, slug, abbr, logo) 
-                   VALUES (%s, %s, %s, %s, %s) RETURNING id""",
-                (away_src_id, game_data.get('away_name'), game_data.get('away_slug'), 
-                 game_data.get('away_abbr'), game_data.get('away_logo'))
+        away_src_id = game_data['away_src_id']
+        if away_src_id not in teams_cache and away_src_id not in team_rows:
+            team_rows[away_src_id] = (
+                away_src_id, game_data.get('away_name'), game_data.get('away_slug'),
+                game_data.get('away_abbr'), game_data.get('away_logo')
             )
-            away_team_id = cur.fetchone()['id']
-            stats['teams']['created'] += 1
-        
-        teams_cache[away_src_id] = away_team_id
-    else:
-        away_team_id = teams_cache[away_src_id]
+    
+    return list(team_rows.values())
 
-    # Create tournament-team link for away team
-    if (tourney_id, away_team_id) not in current_tournament_team_links:
-        cur.execute(
-            "INSERT INTO tournament_teams (tournament_id, team_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-            (tourney_id, away_team_id)
-        )
-        if cur.rowcount > 0:
-            stats['tournament_teams_links']['created'] += 1
-        current_tournament_team_links.add((tourney_id, away_team_id))
+
+def collect_game_rows(games: list, tourney_id: int, teams_cache: dict) -> list:
+    """
+    Builds game rows for the games table. All teams must already be cached.
     
-    # Process Game
-    game_src_id = game_data['game_src_id']
-    cur.execute("SELECT id FROM games WHERE src_id = %s", (game_src_id,))
-    result = cur.fetchone()
+    Args:
+        games: Games data from results array
+        tourney_id: Tournament ID in database
+        teams_cache: Cache dict {team_src_id: team_db_id}
     
-    if result:
-        game_id = result['id']
-        cur.execute(
-            """UPDATE games SET 
-               tournament_id = %s, home_team_id = %s, away_team_id = %s,
-               game_ts = %s, game_end = %s, home_score = %s, away_score = %s,
-               home_q1 = %s, home_q2 = %s, home_q3 = %s, home_q4 = %s,
-               home_ot1 = %s, home_ot2 = %s, away_q1 = %s, away_q2 = %s,
-               away_q3 = %s, away_q4 = %s, away_ot1 = %s, away_ot2 = %s,
-               updated_at = NOW() 
-               WHERE id = %s""",
-            (tourney_id, home_team_id, away_team_id,
-             convert_unix_timestamp(game_data['game_ts']), game_data['game_end'], 
-             game_data.get('home_score'), game_data.get('away_score'),
-             game_data.get('home_q1'), game_data.get('home_q2'), 
-             game_data.get('home_q3'), game_data.get('home_q4'), 
-             game_data.get('home_ot1'), game_data.get('home_ot2'),
-             game_data.get('away_q1'), game_data.get('away_q2'), 
-             game_data.get('away_q3'), game_data.get('away_q4'), 
-             game_data.get('away_ot1'), game_data.get('away_ot2'),
-             game_id)
-        )
-        stats['games']['updated'] += 1
-    else:
+    Returns:
+        list: Tuples in the column order of the games INSERT statements
+    """
+    # Same as convert_unix_timestamp(), without a call and lookups per game
+    fromtimestamp = datetime.fromtimestamp
+    
+    return [
+        (game_data['game_src_id'], tourney_id,
+         teams_cache[game_data['home_src_id']], teams_cache[game_data['away_src_id']],
+         fromtimestamp(game_data['game_ts'], UTC), game_data['game_end'], 
+         game_data.get('home_score'), game_data.get('away_score'),
+         game_data.get('home_q1'), game_data.get('home_q2'), 
+         game_data.get('home_q3'), game_data.get('home_q4'), 
+         game_data.get('home_ot1'), game_data.get('home_ot2'),
+         game_data.get('away_q1'), game_data.get('away_q2'), 
+         game_data.get('away_q3'), game_data.get('away_q4'), 
+         game_data.get('away_ot1'), game_data.get('away_ot2'))
+        for game_data in games
+    ]
+
+
+def insert_values(cur, head: str, tail: str, rows: list) -> list:
+    """
+    Inserts rows with multi-row INSERT ... VALUES (...), (...) statements.
+    
+    One statement is parsed and executed per chunk of rows instead of one
+    per row; chunks keep the statement under MAX_QUERY_PARAMS parameters.
+    The statements are never prepared: their text changes with the number
+    of rows, so they would only evict the fixed statements from the cache.
+    
+    Args:
+        cur: Active database cursor
+        head: Statement part before VALUES (INSERT INTO table (columns))
+        tail: Statement part after the values (ON CONFLICT ... RETURNING ...)
+        rows: Tuples of equal length in column order
+    
+    Returns:
+        list: Rows returned by the statements
+    """
+    if not rows:
+        return []
+    
+    placeholders = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+    chunk_size = MAX_QUERY_PARAMS // len(rows[0])
+    returned = []
+    
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        # The statement text depends on the chunk length: not worth preparing
         cur.execute(
-            """INSERT INTO games 
-               (src_id, tournament_id, home_team_id, away_team_id,
-               game_ts, game_end, home_score, away_score,
-               home_q1, home_q2, home_q3, home_q4,
-               home_ot1, home_ot2, away_q1, away_q2,
-               away_q3, away_q4, away_ot1, away_ot2) 
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id""",
-            (game_src_id, tourney_id, home_team_id, away_team_id,
-             convert_unix_timestamp(game_data['game_ts']), game_data['game_end'], 
-             game_data.get('home_score'), game_data.get('away_score'),
-             game_data.get('home_q1'), game_data.get('home_q2'), 
-             game_data.get('home_q3'), game_data.get('home_q4'), 
-             game_data.get('home_ot1'), game_data.get('home_ot2'),
-             game_data.get('away_q1'), game_data.get('away_q2'), 
-             game_data.get('away_q3'), game_data.get('away_q4'), 
-             game_data.get('away_ot1'), game_data.get('away_ot2'))
+            f"{head} VALUES {', '.join([placeholders] * len(chunk))} {tail}",
+            list(chain.from_iterable(chunk)),
+            prepare=False
         )
-        game_id = cur.fetchone()['id']
-        stats['games']['created'] += 1
+        returned.extend(cur.fetchall())
+    
+    return returned
 
-    return stats
 
+def collect_link_rows(games: list, tourney_id: int, teams_cache: dict, linked_team_ids: set) -> list:
+    """
+    Builds tournament_teams rows for the teams playing in the games
+    that are not linked to the tournament yet.
+    
+    Args:
+        games: Games data from the tournament's results array
+        tourney_id: Tournament ID in database
+        teams_cache: Cache dict {team_src_id: team_db_id}, must hold all teams
+        linked_team_ids: Ids of the teams already linked to the tournament
+    
+    Returns:
+        list: Tuples (tournament_id, team_id), each team once
+    """
+    team_ids = dict.fromkeys(
+        teams_cache[src_id]
+        for game_data in games
+        for src_id in (game_data['home_src_id'], game_data['away_src_id'])
+    )
+    return [(tourney_id, team_id) for team_id in team_ids if team_id not in linked_team_ids]
 
-def process_game_insert_only(
+
+def link_tournament_teams(
     cur, 
-    game_data: dict, 
+    games: list, 
     tourney_id: int, 
     teams_cache: dict, 
-    current_tournament_team_links: set
-) -> dict:
+    linked_team_ids: set
+) -> int:
     """
-    Processes a single game with INSERT ONLY (skips existing records).
+    Links the teams playing in the games to the tournament with one batched
+    INSERT. Prefetched links are not sent at all, links created meanwhile
+    are skipped by the primary key.
+    
+    Runs in its own pipeline block, so the row count is final on return.
     
     Args:
         cur: Active database cursor
-        game_data: Single game data from results array
+        games: Games data from the tournament's results array
         tourney_id: Tournament ID in database
-        teams_cache: Cache dict {team_src_id: team_db_id}
-        current_tournament_team_links: Set of (tournament_id, team_id) tuples
+        teams_cache: Cache dict {team_src_id: team_db_id}, must hold all teams
+        linked_team_ids: Ids of the teams already linked to the tournament
     
     Returns:
-        dict: Statistics of operations performed
+        int: Number of links created
     """
-    stats = {
-        'teams': {'created': 0, 'skipped': 0},
-        'tournament_teams_links': {'created': 0},
-        'games': {'created': 0, 'skipped': 0}
-    }
+    link_rows = collect_link_rows(games, tourney_id, teams_cache, linked_team_ids)
+    if not link_rows:
+        return 0
     
-    # Process Home Team (INSERT only)
-    home_src_id = game_data['home_src_id']
-    if home_src_id not in teams_cache:
-        cur.execute("SELECT id FROM teams WHERE src_id = %s", (home_src_id,))
-        result = cur.fetchone()
-        
-        if result:
-            home_team_id = result['id']
-            stats['teams']['skipped'] += 1
-        else:
-            cur.execute(
-                """INSERT INTO teams (src_id, name, slug, abbr, logo) 
-                   VALUES (%s, %s, %s, %s, %s) RETURNING id""",
-                (home_src_id, game_data.get('home_name'), game_data.get('home_slug'), 
-                 game_data.get('home_abbr'), game_data.get('home_logo'))
-            )
-            home_team_id = cur.fetchone()['id']
-            stats['teams']['created'] += 1
-        
-        teams_cache[home_src_id] = home_team_id
-    else:
-        home_team_id = teams_cache[home_src_id]
+    with cur.connection.pipeline():
+        cur.executemany(SQL_INSERT_TOURNAMENT_TEAM, link_rows)
+    return cur.rowcount
 
-    # Create tournament-team link for home team
-    if (tourney_id, home_team_id) not in current_tournament_team_links:
-        cur.execute(
-            "INSERT INTO tournament_teams (tournament_id, team_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-            (tourney_id, home_team_id)
+
+def copy_game_rows(cur, game_rows: list) -> None:
+    """
+    Bulk-loads game rows into the (emptied) games_stage temp table with binary COPY.
+    
+    COPY skips SQL parsing and per-row INSERT execution entirely, but has no
+    ON CONFLICT: the rows are merged into games from games_stage with one
+    INSERT ... SELECT ... ON CONFLICT statement, so rows inserted by another
+    writer in the meantime cannot abort the load. COPY is not available
+    in pipeline mode.
+    
+    Args:
+        cur: Active database cursor
+        game_rows: Tuples as built by collect_game_rows(), one per src_id
+    """
+    cur.execute(SQL_CREATE_GAMES_STAGE)
+    cur.execute(SQL_TRUNCATE_GAMES_STAGE)
+    with cur.copy(SQL_COPY_GAMES_STAGE) as copy:
+        copy.set_types(GAME_COPY_TYPES)
+        for row in game_rows:
+            copy.write_row(row)
+
+
+def process_games_with_update(
+    cur, 
+    games: list, 
+    tourney_id: int, 
+    teams_cache: dict,
+    linked_team_ids: set
+) -> Counter:
+    """
+    Processes all games of a tournament with UPDATE for existing records.
+    
+    Rows are collected first and then flushed with one batched
+    INSERT ... ON CONFLICT DO UPDATE per table, instead of
+    a SELECT + UPDATE/INSERT round trip per team and game.
+    Large batches of games (COPY_GAMES_MIN_ROWS and more) are copied
+    into the games_stage temp table and merged with a single statement.
+    
+    Each batch runs in a pipeline block: on exit the block syncs, so its
+    results are read before the next dependent batch is queued, also when
+    the caller's cursor is already in pipeline mode. Independent batches
+    (tournament links and games) share one block.
+    
+    Args:
+        cur: Active database cursor
+        games: Games data from the tournament's results array
+        tourney_id: Tournament ID in database
+        teams_cache: Cache dict {team_src_id: team_db_id}
+        linked_team_ids: Ids of the teams already linked to the tournament
+    
+    Returns:
+        Counter: Statistics of operations performed {(entity, operation): count}
+    """
+    stats = Counter()
+    
+    if not games:
+        return stats
+    
+    # Upsert Teams (xmax = 0 only for freshly inserted rows)
+    team_rows = collect_team_rows(games, teams_cache)
+    if team_rows:
+        with cur.connection.pipeline():
+            cur.executemany(
+                SQL_UPSERT_TEAM,
+                team_rows,
+                returning=True
+            )
+        for _ in cur.results():
+            result = cur.fetchone()
+            teams_cache[result[1]] = result[0]
+            if result[2]:
+                stats['teams', 'created'] += 1
+            else:
+                stats['teams', 'updated'] += 1
+
+    # Create tournament-team links and upsert Games
+    game_rows = collect_game_rows(games, tourney_id, teams_cache)
+    
+    if len(game_rows) >= COPY_GAMES_MIN_ROWS:
+        stats['tournament_teams_links', 'created'] += link_tournament_teams(
+            cur, games, tourney_id, teams_cache, linked_team_ids
         )
-        if cur.rowcount > 0:
-            stats['tournament_teams_links']['created'] += 1
-        current_tournament_team_links.add((tourney_id, home_team_id))
-
-    # Process Away Team (INSERT only)
-    away_src_id = game_data['away_src_id']
-    if away_src_id not in teams_cache:
-        cur.execute("SELECT id FROM teams WHERE src_id = %s", (away_src_id,))
-        result = cur.fetchone()
         
-        if result:
-            away_team_id = result['id']
-            stats['teams']['skipped'] += 1
-        else:
-            cur.execute(
-                """INSERT INTO teams (src_id, name, slug, abbr, logo) 
-                   VALUES (%s, %s, %s, %s, %s) RETURNING id""",
-                (away_src_id, game_data.get('away_name'), game_data.get('away_slug'), 
-                 game_data.get('away_abbr'), game_data.get('away_logo'))
-            )
-            away_team_id = cur.fetchone()['id']
-            stats['teams']['created'] += 1
+        # A row may be merged only once per statement: last occurrence wins,
+        # like with one upsert per row
+        merge_rows = {row[0]: row for row in game_rows}
         
-        teams_cache[away_src_id] = away_team_id
+        copy_game_rows(cur, list(merge_rows.values()))
+        cur.execute(SQL_MERGE_GAMES_STAGE, prepare=True)
+        created = cur.fetchone()[0]
+        
+        stats['games', 'created'] += created
+        stats['games', 'updated'] += len(game_rows) - created
     else:
-        away_team_id = teams_cache[away_src_id]
+        # Neither batch needs the results of the other: queue both
+        # (links on a second cursor) and wait for the server only once
+        link_rows = collect_link_rows(games, tourney_id, teams_cache, linked_team_ids)
+        with cur.connection.cursor() as link_cur:
+            with cur.connection.pipeline():
+                if link_rows:
+                    link_cur.executemany(SQL_INSERT_TOURNAMENT_TEAM, link_rows)
+                cur.executemany(
+                    SQL_UPSERT_GAME,
+                    game_rows,
+                    returning=True
+                )
+            if link_rows:
+                stats['tournament_teams_links', 'created'] += link_cur.rowcount
+        
+        for _ in cur.results():
+            if cur.fetchone()[0]:
+                stats['games', 'created'] += 1
+            else:
+                stats['games', 'updated'] += 1
 
-    # Create tournament-team link for away team
-    if (tourney_id, away_team_id) not in current_tournament_team_links:
-        cur.execute(
-            "INSERT INTO tournament_teams (tournament_id, team_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-            (tourney_id, away_team_id)
-        )
-        if cur.rowcount > 0:
-            stats['tournament_teams_links']['created'] += 1
-        current_tournament_team_links.add((tourney_id, away_team_id))
+    return stats
+
+
+def process_games_insert_only(
+    cur, 
+    games: list, 
+    tourney_id: int, 
+    teams_cache: dict,
+    existing_teams: dict,
+    linked_team_ids: set
+) -> Counter:
+    """
+    Processes all games of a tournament with INSERT ONLY (skips existing records).
     
-    # Process Game (INSERT only)
-    game_src_id = game_data['game_src_id']
-    cur.execute("SELECT id FROM games WHERE src_id = %s", (game_src_id,))
-    result = cur.fetchone()
+    Large batches of games (COPY_GAMES_MIN_ROWS and more) are copied into
+    the games_stage temp table and inserted with a single
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING; smaller batches use
+    multi-row INSERT ... ON CONFLICT DO NOTHING.
     
-    if result:
-        stats['games']['skipped'] += 1
+    Args:
+        cur: Active database cursor
+        games: Games data from the tournament's results array
+        tourney_id: Tournament ID in database
+        teams_cache: Cache dict {team_src_id: team_db_id}
+        existing_teams: Prefetched ids of existing teams {team_src_id: team_db_id}
+        linked_team_ids: Ids of the teams already linked to the tournament
+    
+    Returns:
+        Counter: Statistics of operations performed {(entity, operation): count}
+    """
+    stats = Counter()
+    
+    if not games:
+        return stats
+    
+    # Skip teams that existed before the file was loaded
+    team_rows = collect_team_rows(games, teams_cache)
+    for team_row in team_rows:
+        team_id = existing_teams.get(team_row[0])
+        if team_id is not None:
+            teams_cache[team_row[0]] = team_id
+            stats['teams', 'skipped'] += 1
+    
+    # Insert new Teams at once, SELECT only the ones inserted concurrently
+    new_team_rows = [team_row for team_row in team_rows if team_row[0] not in teams_cache]
+    for result in insert_values(cur, SQL_INSERT_TEAMS_HEAD, SQL_INSERT_TEAMS_TAIL, new_team_rows):
+        teams_cache[result[1]] = result[0]
+        stats['teams', 'created'] += 1
+    
+    for team_row in new_team_rows:
+        if team_row[0] not in teams_cache:
+            cur.execute(SQL_SELECT_TEAM_ID, (team_row[0],), prepare=True)
+            teams_cache[team_row[0]] = cur.fetchone()[0]
+            stats['teams', 'skipped'] += 1
+
+    # Create tournament-team links
+    stats['tournament_teams_links', 'created'] += link_tournament_teams(
+        cur, games, tourney_id, teams_cache, linked_team_ids
+    )
+    
+    # Process Games (INSERT only)
+    game_rows = collect_game_rows(games, tourney_id, teams_cache)
+    
+    if len(game_rows) >= COPY_GAMES_MIN_ROWS:
+        # First occurrence wins, like with one INSERT ... ON CONFLICT DO NOTHING per row
+        new_rows = {}
+        for row in game_rows:
+            new_rows.setdefault(row[0], row)
+        
+        copy_game_rows(cur, list(new_rows.values()))
+        cur.execute(SQL_INSERT_GAMES_STAGE, prepare=True)
+        created = cur.fetchone()[0]
+        
+        stats['games', 'created'] += created
+        stats['games', 'skipped'] += len(game_rows) - created
     else:
-        cur.execute(
-            """INSERT INTO games 
-               (src_id, tournament_id, home_team_id, away_team_id,
-               game_ts, game_end, home_score, away_score,
-               home_q1, home_q2, home_q3, home_q4,
-               home_ot1, home_ot2, away_q1, away_q2,
-               away_q3, away_q4, away_ot1, away_ot2) 
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id""",
-            (game_src_id, tourney_id, home_team_id, away_team_id,
-             convert_unix_timestamp(game_data['game_ts']), game_data['game_end'], 
-             game_data.get('home_score'), game_data.get('away_score'),
-             game_data.get('home_q1'), game_data.get('home_q2'), 
-             game_data.get('home_q3'), game_data.get('home_q4'), 
-             game_data.get('home_ot1'), game_data.get('home_ot2'),
-             game_data.get('away_q1'), game_data.get('away_q2'), 
-             game_data.get('away_q3'), game_data.get('away_q4'), 
-             game_data.get('away_ot1'), game_data.get('away_ot2'))
-        )
-        game_id = cur.fetchone()['id']
-        stats['games']['created'] += 1
+        created = len(insert_values(cur, SQL_INSERT_GAMES_HEAD, SQL_INSERT_GAMES_TAIL, game_rows))
+        stats['games', 'created'] += created
+        stats['games', 'skipped'] += len(game_rows) - created
 
     return stats
 
@@ -357,8 +665,9 @@ def process_tournament_with_update(
     cur,
     tournament_data: dict,
     areas_cache: dict,
-    teams_cache: dict
-) -> dict:
+    teams_cache: dict,
+    existing_links: dict
+) -> Counter:
     """
     Processes a single tournament with all its games (with UPDATE).
     
@@ -367,34 +676,25 @@ def process_tournament_with_update(
         tournament_data: Single tournament data with area, tournament info and results
         areas_cache: Cache dict {area_src_id: area_db_id}
         teams_cache: Cache dict {team_src_id: team_db_id}
+        existing_links: Prefetched links {tourney_src_id: set of team ids}
     
     Returns:
-        dict: Aggregated statistics of operations performed
-    """
-    stats = {
-        'areas': {'created': 0, 'updated': 0},
-        'tournaments': {'created': 0, 'updated': 0},
-        'teams': {'created': 0, 'updated': 0},
-        'tournament_teams_links': {'created': 0},
-        'games': {'created': 0, 'updated': 0}
-    }
+        Counter: Aggregated statistics of operations performed {(entity, operation): count}
+    """
+    stats = Counter()
     
     # Process Area
     area_src_id = tournament_data['area_src_id']
     area_name = tournament_data['area_name']
     
     if area_src_id not in areas_cache:
-        cur.execute("SELECT id FROM areas WHERE src_id = %s", (area_src_id,))
-        result = cur.fetchone()
+        cur.execute(SQL_UPSERT_AREA, (area_src_id, area_name), prepare=True)
+        area_id, inserted = cur.fetchone()
         
-        if result:
-            area_id = result['id']
-            cur.execute("UPDATE areas SET name = %s, updated_at = NOW() WHERE id = %s", (area_name, area_id))
-            stats['areas']['updated'] += 1
+        if inserted:
+            stats['areas', 'created'] += 1
         else:
-            cur.execute("INSERT INTO areas (src_id, name) VALUES (%s, %s) RETURNING id", (area_src_id, area_name))
-            area_id = cur.fetchone()['id']
-            stats['areas']['created'] += 1
+            stats['areas', 'updated'] += 1
         
         areas_cache[area_src_id] = area_id
     else:
@@ -404,51 +704,28 @@ def process_tournament_with_update(
     tourney_src_id = tournament_data['tourney_src_id']
     tourney_name = tournament_data['tourney_name']
     
-    cur.execute("SELECT id FROM tournaments WHERE src_id = %s", (tourney_src_id,))
-    result = cur.fetchone()
+    cur.execute(
+        SQL_UPSERT_TOURNAMENT,
+        (tourney_src_id, area_id, tourney_name, tournament_data.get('tourney_code'), 
+         tournament_data.get('tourney_url'), tournament_data.get('tourney_logo'), 
+         tournament_data.get('tourney_status')),
+        prepare=True
+    )
+    tourney_id, inserted = cur.fetchone()
     
-    if result:
-        tourney_id = result['id']
-        cur.execute(
-            """UPDATE tournaments SET 
-               area_id = %s, name = %s, code = %s, url = %s, 
-               logo = %s, status = %s, updated_at = NOW() 
-               WHERE id = %s""",
-            (area_id, tourney_name, tournament_data.get('tourney_code'), 
-             tournament_data.get('tourney_url'), tournament_data.get('tourney_logo'), 
-             tournament_data.get('tourney_status'), tourney_id)
-        )
-        stats['tournaments']['updated'] += 1
+    if inserted:
+        stats['tournaments', 'created'] += 1
     else:
-        cur.execute(
-            """INSERT INTO tournaments 
-               (src_id, area_id, name, code, url, logo, status) 
-               VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id""",
-            (tourney_src_id, area_id, tourney_name, tournament_data.get('tourney_code'), 
-             tournament_data.get('tourney_url'), tournament_data.get('tourney_logo'), 
-             tournament_data.get('tourney_status'))
-        )
-        tourney_id = cur.fetchone()['id']
-        stats['tournaments']['created'] += 1
+        stats['tournaments', 'updated'] += 1
 
     # Process all games in this tournament
-    current_tournament_team_links = set()
-    
-    for game_data in tournament_data['results']:
-        game_stats = process_game_with_update(
-            cur=cur,
-            game_data=game_data,
-            tourney_id=tourney_id,
-            teams_cache=teams_cache,
-            current_tournament_team_links=current_tournament_team_links
-        )
-        
-        # Aggregate statistics
-        stats['teams']['created'] += game_stats['teams']['created']
-        stats['teams']['updated'] += game_stats['teams']['updated']
-        stats['tournament_teams_links']['created'] += game_stats['tournament_teams_links']['created']
-        stats['games']['created'] += game_stats['games']['created']
-        stats['games']['updated'] += game_stats['games']['updated']
+    stats.update(process_games_with_update(
+        cur=cur,
+        games=tournament_data['results'],
+        tourney_id=tourney_id,
+        teams_cache=teams_cache,
+        linked_team_ids=existing_links.get(tourney_src_id, frozenset())
+    ))
     
     return stats
 
@@ -457,88 +734,87 @@ def process_tournament_insert_only(
     cur,
     tournament_data: dict,
     areas_cache: dict,
-    teams_cache: dict
-) -> dict:
+    teams_cache: dict,
+    existing_ids: dict
+) -> Counter:
     """
     Processes a single tournament with all its games (INSERT ONLY).
     
+    Entities found in existing_ids are skipped without a query; the others
+    are inserted, with a SELECT only if they were inserted concurrently.
+    
     Args:
         cur: Active database cursor
         tournament_data: Single tournament data with area, tournament info and results
         areas_cache: Cache dict {area_src_id: area_db_id}
         teams_cache: Cache dict {team_src_id: team_db_id}
+        existing_ids: Ids prefetched by prefetch_existing_ids()
     
     Returns:
-        dict: Aggregated statistics of operations performed
-    """
-    stats = {
-        'areas': {'created': 0, 'skipped': 0},
-        'tournaments': {'created': 0, 'skipped': 0},
-        'teams': {'created': 0, 'skipped': 0},
-        'tournament_teams_links': {'created': 0},
-        'games': {'created': 0, 'skipped': 0}
-    }
+        Counter: Aggregated statistics of operations performed {(entity, operation): count}
+    """
+    stats = Counter()
     
     # Process Area (INSERT only)
     area_src_id = tournament_data['area_src_id']
     area_name = tournament_data['area_name']
     
-    if area_src_id not in areas_cache:
-        cur.execute("SELECT id FROM areas WHERE src_id = %s", (area_src_id,))
+    if area_src_id in areas_cache:
+        area_id = areas_cache[area_src_id]
+    elif area_src_id in existing_ids['areas']:
+        area_id = existing_ids['areas'][area_src_id]
+        areas_cache[area_src_id] = area_id
+        stats['areas', 'skipped'] += 1
+    else:
+        # SELECT the existing row only if nothing was inserted
+        cur.execute(SQL_INSERT_AREA, (area_src_id, area_name), prepare=True)
         result = cur.fetchone()
         
         if result:
-            area_id = result['id']
-            stats['areas']['skipped'] += 1
+            stats['areas', 'created'] += 1
         else:
-            cur.execute("INSERT INTO areas (src_id, name) VALUES (%s, %s) RETURNING id", (area_src_id, area_name))
-            area_id = cur.fetchone()['id']
-            stats['areas']['created'] += 1
+            cur.execute(SQL_SELECT_AREA_ID, (area_src_id,), prepare=True)
+            result = cur.fetchone()
+            stats['areas', 'skipped'] += 1
         
+        area_id = result[0]
         areas_cache[area_src_id] = area_id
-    else:
-        area_id = areas_cache[area_src_id]
 
     # Process Tournament (INSERT only)
     tourney_src_id = tournament_data['tourney_src_id']
     tourney_name = tournament_data['tourney_name']
     
-    cur.execute("SELECT id FROM tournaments WHERE src_id = %s", (tourney_src_id,))
-    result = cur.fetchone()
-    
-    if result:
-        tourney_id = result['id']
-        stats['tournaments']['skipped'] += 1
+    if tourney_src_id in existing_ids['tournaments']:
+        tourney_id = existing_ids['tournaments'][tourney_src_id]
+        stats['tournaments', 'skipped'] += 1
     else:
         cur.execute(
-            """INSERT INTO tournaments 
-               (src_id, area_id, name, code, url, logo, status) 
-               VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id""",
+            SQL_INSERT_TOURNAMENT,
             (tourney_src_id, area_id, tourney_name, tournament_data.get('tourney_code'), 
              tournament_data.get('tourney_url'), tournament_data.get('tourney_logo'), 
-             tournament_data.get('tourney_status'))
+             tournament_data.get('tourney_status')),
+            prepare=True
         )
-        tourney_id = cur.fetchone()['id']
-        stats['tournaments']['created'] += 1
+        result = cur.fetchone()
+        
+        if result:
+            stats['tournaments', 'created'] += 1
+        else:
+            cur.execute(SQL_SELECT_TOURNAMENT_ID, (tourney_src_id,), prepare=True)
+            result = cur.fetchone()
+            stats['tournaments', 'skipped'] += 1
+        
+        tourney_id = result[0]
 
     # Process all games in this tournament
-    current_tournament_team_links = set()
-    
-    for game_data in tournament_data['results']:
-        game_stats = process_game_insert_only(
-            cur=cur,
-            game_data=game_data,
-            tourney_id=tourney_id,
-            teams_cache=teams_cache,
-            current_tournament_team_links=current_tournament_team_links
-        )
-        
-        # Aggregate statistics
-        stats['teams']['created'] += game_stats['teams']['created']
-        stats['teams']['skipped'] += game_stats['teams']['skipped']
-        stats['tournament_teams_links']['created'] += game_stats['tournament_teams_links']['created']
-        stats['games']['created'] += game_stats['games']['created']
-        stats['games']['skipped'] += game_stats['games']['skipped']
+    stats.update(process_games_insert_only(
+        cur=cur,
+        games=tournament_data['results'],
+        tourney_id=tourney_id,
+        teams_cache=teams_cache,
+        existing_teams=existing_ids['teams'],
+        linked_team_ids=existing_ids['tournament_teams'].get(tourney_src_id, frozenset())
+    ))
     
     return stats
 
@@ -547,118 +823,85 @@ def process_tournament_insert_only(
 # LEVEL 1: Process entire JSON file
 # =============================================================================
 
-def load_to_db(cur, file_in: str):
+def format_stats(stats: dict) -> str:
     """
-    Loads data from a JSON file into the database with UPDATE for existing records.
+    Formats loader statistics as a single log line, omitting entities with no operations.
     
-    This function does not manage the connection or transaction lifecycle.
-    It assumes the caller handles connection creation and transaction management.
-    
-    Args:
-        cur: An active database cursor object.
-        file_in (str): Path to the input JSON file.
+    Example:
+        'Areas: Created 1, Updated 0; Games: Created 10, Updated 2'
     """
-    logger = logging.getLogger(__name__)
-    
-    source_file_path = Path(file_in)
-    
-    if not validate_json_file(file_in):
-        logger.error(f"Invalid or missing JSON file: {file_in}")
-        raise ValueError(f"Invalid or missing JSON file: {file_in}")
-    
-    logger.info(f"Processing file: {source_file_path}")
-    
-    stats = {
-        'areas': {'created': 0, 'updated': 0},
-        'tournaments': {'created': 0, 'updated': 0},
-        'teams': {'created': 0, 'updated': 0},
-        'tournament_teams_links': {'created': 0},
-        'games': {'created': 0, 'updated': 0}
-    }
-    
-    areas_cache = {}
-    teams_cache = {}
+    return "; ".join(
+        f"{entity.capitalize()}: "
+        + ", ".join(f"{operation.capitalize()} {count}" for operation, count in entity_counts.items())
+        for entity, entity_counts in stats.items()
+        if any(entity_counts.values())
+    )
 
-    with open(source_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    for tournament_data in data:
-        tournament_stats = process_tournament_with_update(
-            cur=cur,
-            tournament_data=tournament_data,
-            areas_cache=areas_cache,
-            teams_cache=teams_cache
-        )
-        
-        # Aggregate statistics
-        for entity_type in stats:
-            for operation in stats[entity_type]:
-                stats[entity_type][operation] += tournament_stats[entity_type][operation]
-
-    logger.info(f"Finished processing file: {source_file_path}. Stats:")
-    for entity_type, counts in stats.items():
-        created = counts.get('created', 0)
-        updated = counts.get('updated', 0)
-        if created > 0 or updated > 0:
-            logger.info(f"  - {entity_type.capitalize()}: Created {created}, Updated {updated}")
-    
-    return stats
 
+# Per-mode loader parts: (prefetch of existing rows, tournament processor, statistics shape)
+LOAD_MODES = {
+    'upsert': (prefetch_tournament_links, process_tournament_with_update, UPDATE_STATS_SHAPE),
+    'insert_only': (prefetch_existing_ids, process_tournament_insert_only, INSERT_ONLY_STATS_SHAPE),
+}
 
-def load_to_db_insert_only(cur, file_in: str):
+
+def load_to_db(cur, file_in: str, mode: str = 'upsert'):
     """
-    Loads data from a JSON file into the database with INSERT ONLY (skips existing records).
+    Loads data from a JSON file into the database.
     
     This function does not manage the connection or transaction lifecycle.
     It assumes the caller handles connection creation and transaction management.
+    It turns synchronous_commit off for the caller's transaction only.
+    
+    Tournaments are processed one after another on the caller's cursor:
+    the whole file is loaded in one transaction, and tournaments of a file
+    share team rows, so loading them concurrently on several connections
+    would lose the all-or-nothing load and race on the same teams.
     
     Args:
         cur: An active database cursor object.
         file_in (str): Path to the input JSON file.
+        mode (str): 'upsert' to UPDATE existing records,
+                    'insert_only' to INSERT new records and skip existing ones.
+    
+    Returns:
+        dict: Statistics {entity: {operation: count}}
     """
-    logger = logging.getLogger(__name__)
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode: {mode!r}, expected one of {list(LOAD_MODES)}")
+    
+    prefetch, process_tournament, stats_shape = LOAD_MODES[mode]
     
     source_file_path = Path(file_in)
     
-    if not validate_json_file(file_in):
+    data = read_json_file(source_file_path)
+    if data is None:
         logger.error(f"Invalid or missing JSON file: {file_in}")
         raise ValueError(f"Invalid or missing JSON file: {file_in}")
     
-    logger.info(f"Processing file (INSERT ONLY): {source_file_path}")
+    logger.info(f"Processing file ({mode}): {source_file_path}")
     
-    stats = {
-        'areas': {'created': 0, 'skipped': 0},
-        'tournaments': {'created': 0, 'skipped': 0},
-        'teams': {'created': 0, 'skipped': 0},
-        'tournament_teams_links': {'created': 0},
-        'games': {'created': 0, 'skipped': 0}
-    }
+    counts = Counter()
     
     areas_cache = {}
     teams_cache = {}
-
-    with open(source_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
     
-    for tournament_data in data:
-        tournament_stats = process_tournament_insert_only(
-            cur=cur,
-            tournament_data=tournament_data,
-            areas_cache=areas_cache,
-            teams_cache=teams_cache
-        )
+    # Loader queries read rows by position: use a tuple-row cursor
+    # on the caller's connection (same transaction)
+    with cur.connection.cursor(row_factory=tuple_row) as tuple_cur:
+        tuple_cur.execute(SQL_LOAD_SETTINGS)
         
-        # Aggregate statistics
-        for entity_type in stats:
-            for operation in stats[entity_type]:
-                stats[entity_type][operation] += tournament_stats[entity_type][operation]
-
-    logger.info(f"Finished processing file: {source_file_path}. Stats:")
-    for entity_type, counts in stats.items():
-        created = counts.get('created', 0)
-        skipped = counts.get('skipped', 0)
-        if created > 0 or skipped > 0:
-            logger.info(f"  - {entity_type.capitalize()}: Created {created}, Skipped {skipped}")
+        # One query per table instead of a probe per area, tournament, team and link
+        existing = prefetch(tuple_cur, data)
+        
+        for tournament_data in data:
+            counts.update(process_tournament(
+                tuple_cur, tournament_data, areas_cache, teams_cache, existing
+            ))
+
+    stats = nest_stats(counts, stats_shape)
+    
+    logger.info(f"Finished processing file: {source_file_path}. Stats: {format_stats(stats)}")
     
     return stats
 
@@ -668,7 +911,7 @@ def load_to_db_insert_only(cur, file_in: str):
 # =============================================================================
 
 if __name__ == "__main__":
-    logger = setup_logging()
+    setup_logging()
     
     if len(sys.argv) < 2:
         print("Usage: python loader.py <path_to_json_file> [--insert-only]")
@@ -686,7 +929,7 @@ if __name__ == "__main__":
         with transaction() as cur:
             if insert_only:
                 logger.info("Running in INSERT ONLY mode")
-                load_to_db(cur, file_path)
+            load_to_db(cur, file_path, mode='insert_only' if insert_only else 'upsert')
                 
     except Exception as e:
         logger.error(f"Critical error while processing file {file_path}: {e}", exc_info=True)
@@ -40,19 +40,11 @@ def get_tournament_teams(tournament_id: int) -> List[Dict[str, str]]:
             # Execute the query, passing parameters as a tuple in the second argument
             cur.execute(sql_query, (tournament_id,))
             
-            # fetchall() will return a list of dictionaries, as row_factory=dict_row is set in the pool
-            db_results = cur.fetchall()
+            # fetchall() will return a list of dictionaries, as row_factory=dict_row is set in the pool.
+            # All selected columns are VARCHAR NOT NULL, so the rows already have
+            # exactly the keys and str values callers expect - no per-row rebuild.
+            teams_list = cur.fetchall()
 
-        # Form the final list, ensuring all values are strings
-        teams_list = [
-            {
-                "area_src_id": str(row["area_src_id"]),
-                "team_src_id": str(row["team_src_id"]),
-                "team_name": str(row["team_name"])
-            }
-            for row in db_results
-        ]
-        
         logger.info(f"Found {len(teams_list)} teams for tournament_id={tournament_id}")
         return teams_list
 
@@ -60,4 +52,4 @@ def get_tournament_teams(tournament_id: int) -> List[Dict[str, str]]:
         logger.error(f"Error fetching teams for tournament_id={tournament_id}: {e}", exc_info=True)
         # In case of a database error, it's safer to return an empty list
         # to avoid crashing the calling code.
-        return []
\ No newline at end of file
+        return []
@@ -1,7 +1,10 @@
 # scrapers\fs_scraper.py
 
+import os
 import sys
 import logging
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
 from pathlib import Path
 import shutil
@@ -20,13 +23,23 @@ BY_TEAM_UPLOADED_FOLDER = project_root / "data/by_team/uploaded"
 
 TOURNAMENT_ID=60
 
+# Number of feeds scraped at the same time. Scraping is I/O-bound (network
+# and delays), and every request picks its own random proxy.
+SCRAPE_WORKERS = 10
+
+# Number of processes converting scraped feeds (CPU-bound); None = os.cpu_count()
+CONVERT_WORKERS = None
+
+# Scraped feeds waiting for (or in) conversion at most; scraping threads
+# wait for a free slot, which bounds the feed texts held in memory
+CONVERT_QUEUE_SIZE = 8
+
 from utils.fs_helpers import (
     get_date_as_str,
     get_url_by_date,
     get_url_by_team,
     scrape_basket_results,
-    convert_to_raw_json,
-    convert_to_nice_json
+    convert_feed
 )
 
 # --- SETUP LOGGING ---
@@ -38,7 +51,7 @@ logger = logging.getLogger(__name__)
 
 from utils.session_manager import SessionManager
 from database.connection import transaction, check_connection, get_pool
-from database.loader import load_to_db, load_to_db_insert_only
+from database.loader import load_to_db
 from database.queries import get_tournament_teams
 
 
@@ -47,6 +60,10 @@ def load_scraped_data_to_db(input_folder: Path, output_folder: Path, insert_only
     Iterates through JSON files in an input folder, loads them to the database,
     and moves successfully processed files to an output folder.
 
+    All files are loaded in a single transaction and moved after its commit.
+    If the batch fails, each file is loaded again in its own transaction,
+    so one bad file does not block the others.
+
     Args:
         input_folder: Path to the directory containing JSON files to process.
         output_folder: Path to the directory where processed files will be moved.
@@ -73,45 +90,81 @@ def load_scraped_data_to_db(input_folder: Path, output_folder: Path, insert_only
         'total_updated': 0
     }
 
-    # 3. Iterate through all .json files in the input directory
-    # Path.glob() is convenient for finding files by a pattern
-    json_files = list(input_folder.glob("*.json"))
+    # 3. Collect all .json files in the input directory.
+    # os.scandir() yields entries with their file type already known,
+    # so no extra stat() call is needed per file.
+    with os.scandir(input_folder) as entries:
+        json_files = [
+            Path(entry.path)
+            for entry in entries
+            if entry.name.endswith(".json") and entry.is_file()
+        ]
     if not json_files:
         logger.info(f"No .json files found in {input_folder}. Nothing to do.")
         return total_stats
 
-    for file_path in json_files:
+    load_mode = 'insert_only' if insert_only else 'upsert'
+
+    def finish_file(file_path: Path, stats: dict) -> None:
+        # Update the overall statistics
+        if stats:
+            total_stats['total_inserted'] += stats.get('inserted', 0)
+            total_stats['total_updated'] += stats.get('updated', 0)
+
+        # os.replace is a single rename on the same drive; shutil.move also
+        # handles folders on different drives (copy + delete).
+        destination_path = output_folder / file_path.name
         try:
-            logger.info(f"Processing file: {file_path.name}")
-            
-            # 4. For EACH file, open its own transaction.
-            # This is critically important: if one file fails, the transactions for
-            # other files will not be affected.
-            with transaction() as cur:
-                if insert_only:
-                    stats = load_to_db_insert_only(cur, str(file_path))
-                else:
-                    stats = load_to_db(cur, str(file_path))
-
-                # Update the overall statistics
-                if stats:
-                    total_stats['total_inserted'] += stats.get('inserted', 0)
-                    total_stats['total_updated'] += stats.get('updated', 0)
-
-            # 5. If the transaction was successful (without exceptions), move the file.
-            # shutil.move is more reliable than Path.rename, especially if folders are on different drives.
-            destination_path = output_folder / file_path.name
-            shutil.move(str(file_path), str(destination_path))
-            
-            total_stats['files_processed'] += 1
-            logger.info(f"Successfully loaded and moved file: {file_path.name} -> {destination_path}")
+            os.replace(file_path, destination_path)
+        except OSError:
+            shutil.move(file_path, destination_path)
+        
+        total_stats['files_processed'] += 1
+        logger.info(f"Successfully loaded and moved file: {file_path.name} -> {destination_path}")
 
-        except Exception as e:
-            # 6. If an error occurs while processing the file, log it,
-            # but DO NOT interrupt the entire loop. The file remains in input_folder.
-            total_stats['files_failed'] += 1
-            logger.error(f"Failed to process file {file_path.name}: {e}", exc_info=True)
-            # Continue processing the next file
+    # 4. Load all files in ONE transaction: a single commit (and WAL flush)
+    # for the whole batch instead of one per file.
+    loaded = []
+    try:
+        with transaction() as cur:
+            for file_path in json_files:
+                logger.info(f"Processing file: {file_path.name}")
+                loaded.append((file_path, load_to_db(cur, str(file_path), mode=load_mode)))
+    except Exception as e:
+        logger.warning(
+            f"Batch load of {len(json_files)} files failed ({e}). "
+            f"Falling back to one transaction per file."
+        )
+        loaded = None
+
+    # 5. Files are moved only after the batch transaction has been committed.
+    if loaded is not None:
+        for file_path, stats in loaded:
+            try:
+                finish_file(file_path, stats)
+            except Exception as e:
+                total_stats['files_failed'] += 1
+                logger.error(f"Failed to move file {file_path.name}: {e}", exc_info=True)
+    else:
+        for file_path in json_files:
+            try:
+                logger.info(f"Processing file: {file_path.name}")
+                
+                # 6. For EACH file, open its own transaction.
+                # This is critically important: if one file fails, the transactions for
+                # other files will not be affected.
+                with transaction() as cur:
+                    stats = load_to_db(cur, str(file_path), mode=load_mode)
+
+                # If the transaction was successful (without exceptions), move the file.
+                finish_file(file_path, stats)
+
+            except Exception as e:
+                # If an error occurs while processing the file, log it,
+                # but DO NOT interrupt the entire loop. The file remains in input_folder.
+                total_stats['files_failed'] += 1
+                logger.error(f"Failed to process file {file_path.name}: {e}", exc_info=True)
+                # Continue processing the next file
 
     # 7. At the end, log the final statistics for the entire batch
     logger.info(
@@ -125,7 +178,102 @@ def load_scraped_data_to_db(input_folder: Path, output_folder: Path, insert_only
     return total_stats
 
 
-def scrape_data_for_date_range():
+def scrape_and_convert(
+    session_manager: SessionManager,
+    convert_executor: Executor,
+    convert_slots: threading.BoundedSemaphore,
+    url: str,
+    prefix: str,
+    raw_folder: Path,
+    upload_folder: Path
+) -> Future:
+    """
+    Scrapes one feed and queues its conversion to a JSON file ready for upload.
+    
+    The conversion runs on convert_executor without waiting for it, so the
+    calling thread can scrape the next feed meanwhile (scraping is network-bound,
+    conversion is CPU-bound).
+    
+    Returns:
+        Future: The conversion of the feed
+    
+    Raises:
+        RuntimeError: If the feed could not be scraped (all proxies failed)
+    """
+    # Scrape data
+    text = scrape_basket_results(
+        session_manager=session_manager,
+        url=url,
+        prefix=prefix,
+        out_folder=raw_folder
+    )
+    if text is None:
+        # No .raw.txt fallback: a file left in raw_folder would be from an earlier run
+        raise RuntimeError(f"No feed scraped for {prefix}")
+    
+    # Convert to raw and nice JSON straight from the response text (no .raw.txt round trip)
+    convert_slots.acquire()
+    try:
+        future = convert_executor.submit(
+            convert_feed,
+            prefix=prefix,
+            raw_folder=raw_folder,
+            upload_folder=upload_folder,
+            text=text
+        )
+    except Exception:
+        convert_slots.release()
+        raise
+    future.add_done_callback(lambda _: convert_slots.release())
+    return future
+
+
+def run_scrape_jobs(
+    session_manager: SessionManager,
+    jobs: list[tuple[str, str]],
+    raw_folder: Path,
+    upload_folder: Path
+) -> None:
+    """
+    Runs scrape_and_convert() for (url, prefix) jobs: scraping on SCRAPE_WORKERS
+    threads, conversion on CONVERT_WORKERS processes, with at most
+    CONVERT_QUEUE_SIZE scraped feeds queued between the two stages.
+    
+    A failed job is logged and does not stop the other ones: its file is
+    simply missing from the upload folder.
+    """
+    convert_slots = threading.BoundedSemaphore(CONVERT_QUEUE_SIZE)
+    convert_futures = {}
+
+    with ProcessPoolExecutor(max_workers=CONVERT_WORKERS) as convert_executor:
+        # With the fork start method all conversion processes are started on the
+        # first submit: do it here, before the scraping threads exist. A process
+        # forked while another thread holds a lock (logging, requests) can
+        # hang on that lock forever
+        convert_executor.submit(int).result()
+
+        with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as scrape_executor:
+            scrape_futures = {
+                scrape_executor.submit(
+                    scrape_and_convert, session_manager, convert_executor, convert_slots,
+                    url, prefix, raw_folder, upload_folder
+                ): prefix
+                for url, prefix in jobs
+            }
+            for future in as_completed(scrape_futures):
+                try:
+                    convert_futures[future.result()] = scrape_futures[future]
+                except Exception as e:
+                    logger.error(f"Failed to scrape {scrape_futures[future]}: {e}", exc_info=True)
+
+        for future in as_completed(convert_futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Failed to convert {convert_futures[future]}: {e}", exc_info=True)
+
+
+def scrape_data_for_date_range(session_manager: SessionManager):
     logger.info("--- Starting FlashScore scraper for date range ---")
     
     # Check database connection first
@@ -133,41 +281,18 @@ def scrape_data_for_date_range():
         logger.error("Could not connect to the database. Aborting scraping.")
         return
     
-    # SessionManager initialization (this will load and check proxies)
-    logger.info("Creating and initializing SessionManager...")
-    try:
-        session_manager = SessionManager()
-    except RuntimeError as e:
-        logger.error(f"CRITICAL: {e}")
-        return
-
-    for d in range(-7, 0, 1):
-        
-        dt = date.today() + timedelta(days=d)
-        prefix = get_date_as_str(dt)
-        url = get_url_by_date(dt)
-
-        # Scrape data
-        scrape_basket_results(
-            session_manager=session_manager,
-            url=url,
-            prefix=prefix,
-            out_folder=BY_DATE_RAW_FOLDER
-        )
-        
-        # Convert to raw JSON
-        convert_to_raw_json(
-            prefix=prefix,
-            folder_in=BY_DATE_RAW_FOLDER,
-            folder_out=BY_DATE_RAW_FOLDER
-        )
-
-        # Convert to nice JSON
-        convert_to_nice_json(
-            prefix=prefix,
-            folder_in=BY_DATE_RAW_FOLDER,
-            folder_out=BY_DATE_TO_UPLOAD_FOLDER
-        )
+    # All (url, prefix) jobs are built up front from one "today", so the
+    # scraping threads only do network work on the keep-alive proxy sessions
+    today = date.today()
+    dates = [today + timedelta(days=d) for d in range(-7, 0, 1)]
+    jobs = [(get_url_by_date(dt), get_date_as_str(dt)) for dt in dates]
+
+    run_scrape_jobs(
+        session_manager=session_manager,
+        jobs=jobs,
+        raw_folder=BY_DATE_RAW_FOLDER,
+        upload_folder=BY_DATE_TO_UPLOAD_FOLDER
+    )
         
     # Load to database
     load_scraped_data_to_db(
@@ -177,7 +302,7 @@ def scrape_data_for_date_range():
     )
 
 
-def scrape_data_for_teams():
+def scrape_data_for_teams(session_manager: SessionManager):
     logger.info("--- Starting FlashScore scraper for team data ---")
     
     # Check database connection first
@@ -189,49 +314,26 @@ def scrape_data_for_teams():
     teams = get_tournament_teams(TOURNAMENT_ID)
     logger.info("--- Team list for a given tournament extracted ---")
 
-    # SessionManager initialization (this will load and check proxies)
-    logger.info("Creating and initializing SessionManager...")
-    try:
-        session_manager = SessionManager()
-    except RuntimeError as e:
-        logger.error(f"CRITICAL: {e}")
-        return
-
+    jobs = []
     for team in teams:
-        for step in range(0, 3):
-            
-            area_src_id = team['area_src_id']
-            team_src_id = team['team_src_id']
-            # team_src_id = 'tUT82gR9'
+        area_src_id = team['area_src_id']
+        team_src_id = team['team_src_id']
+        # team_src_id = 'tUT82gR9'
 
+        for step in range(0, 3):
             url = get_url_by_team(
                 area_src_id=area_src_id,
                 team_src_id=team_src_id,
                 step=step
             )
-            prefix = f"{area_src_id}_{team_src_id}_{step}"
-
-            # Scrape data
-            scrape_basket_results(
-                session_manager=session_manager,
-                url=url,
-                prefix=prefix,
-                out_folder=BY_TEAM_RAW_FOLDER
-            )
-            
-            # Convert to raw JSON
-            convert_to_raw_json(
-                prefix=prefix,
-                folder_in=BY_TEAM_RAW_FOLDER,
-                folder_out=BY_TEAM_RAW_FOLDER
-            )
+            jobs.append((url, f"{area_src_id}_{team_src_id}_{step}"))
 
-            # Convert to nice JSON
-            convert_to_nice_json(
-                prefix=prefix,
-                folder_in=BY_TEAM_RAW_FOLDER,
-                folder_out=BY_TEAM_TO_UPLOAD_FOLDER
-            )
+    run_scrape_jobs(
+        session_manager=session_manager,
+        jobs=jobs,
+        raw_folder=BY_TEAM_RAW_FOLDER,
+        upload_folder=BY_TEAM_TO_UPLOAD_FOLDER
+    )
         
     # Load to database
     load_scraped_data_to_db(
@@ -253,9 +355,19 @@ def main():
         with get_pool():
             logger.info("Database connection pool opened. Starting script execution.")
             
+            # SessionManager initialization (this will load and check proxies).
+            # One instance is shared by all scrapers: proxies are checked once
+            # and HTTP connections are kept alive between feeds.
+            logger.info("Creating and initializing SessionManager...")
+            try:
+                session_manager = SessionManager()
+            except RuntimeError as e:
+                logger.error(f"CRITICAL: {e}")
+                return
+            
             # All main logic using the DB is executed here
-            # scrape_data_for_date_range()
-            scrape_data_for_teams()
+            # scrape_data_for_date_range(session_manager)
+            scrape_data_for_teams(session_manager)
             
             logger.info("All scraping and loading tasks finished.")
         
@@ -1,10 +1,12 @@
 import sys
 import os
-import json
+import re
 import logging
 from datetime import date
 from pathlib import Path
 
+import orjson
+
 # Get the path to the project's root directory
 project_root = Path(__file__).resolve().parent.parent
 sys.path.append(str(project_root))
@@ -12,8 +14,24 @@ sys.path.append(str(project_root))
 TEMP_FOLDER = project_root / f"data/temp"
 FINAL_FOLDER = project_root / f"data"
 
+# One "~key÷value" line of a .raw.txt file: leading/trailing whitespace is
+# ignored, the leading '~' marks are captured apart from the key, the value
+# ends at the next '÷' or at the end of the line
+FEED_LINE_RE = re.compile(r'^[^\S\n]*(~*)([^÷\n]*)÷([^÷\n]*?)(?:÷|[^\S\n]*$)', re.MULTILINE)
+
+# Feed keys stored on the tournament; all other keys (except SA) go to the result
+TOURNAMENT_KEYS = frozenset({
+    'ZA', 'ZEE', 'ZB', 'ZY', 'ZC', 'ZD', 'ZE', 'ZF',
+    'ZO', 'ZG', 'ZH', 'ZJ', 'ZL', 'OAJ', 'ZX', 'ZCC',
+    'TSS', 'ZAF', 'ZK', 'ZAC'
+})
+NON_RESULT_KEYS = TOURNAMENT_KEYS | {'SA'}
+
+# Signature header required by the feed endpoints (fetch_with_retry does not modify it)
+X_FSIGN_HEADER = {"X-Fsign": "SW9D1eZo"}
+
 from utils.session_manager import SessionManager
-from utils.helpers import get_offset_by_date, to_int_or_none
+from utils.helpers import get_decoded_text, get_offset_by_date, to_int_or_none
 
 # --- SETUP LOGGING ---
 from utils.logger import setup_logging
@@ -22,6 +40,55 @@ setup_logging(Path(__file__))
 # Get a logger instance for this module
 logger = logging.getLogger(__name__)
 
+def get_game_end(ac: str | None) -> str:
+    """
+    Тип окончания игры по полю AC ленты ('10' - овертайм).
+    """
+    return 'overtime' if ac == '10' else 'standard'
+
+# Поля турнира в nice json: (ключ nice json, ключ raw json)
+NICE_TOURNAMENT_FIELDS = (
+    ('area_src_id', 'ZB'),
+    ('area_name', 'ZY'),
+    ('tourney_src_id', 'ZEE'),
+    ('tourney_name', 'ZA'),
+    ('tourney_code', 'ZAC'),
+    ('tourney_url', 'ZL'),
+    ('tourney_logo', 'OAJ'),
+    ('tourney_status', 'ZCC'),
+)
+
+# Поля результата в nice json: (ключ nice json, ключ raw json, преобразование значения или None)
+NICE_RESULT_FIELDS = (
+    ('game_src_id', 'AA', None),
+    ('game_ts', 'AD', to_int_or_none),
+    ('game_end', 'AC', get_game_end),
+    ('home_src_id', 'PX', None),
+    ('away_src_id', 'PY', None),
+    ('home_name', 'AE', None),
+    ('away_name', 'AF', None),
+    ('home_slug', 'WU', None),
+    ('away_slug', 'WV', None),
+    ('home_abbr', 'WM', None),
+    ('away_abbr', 'WN', None),
+    ('home_score', 'AG', to_int_or_none),
+    ('away_score', 'AH', to_int_or_none),
+    ('home_q1', 'BA', to_int_or_none),
+    ('home_q2', 'BC', to_int_or_none),
+    ('home_q3', 'BE', to_int_or_none),
+    ('home_q4', 'BG', to_int_or_none),
+    ('home_ot1', 'BI', to_int_or_none),
+    ('home_ot2', 'BK', to_int_or_none),
+    ('away_q1', 'BB', to_int_or_none),
+    ('away_q2', 'BD', to_int_or_none),
+    ('away_q3', 'BF', to_int_or_none),
+    ('away_q4', 'BH', to_int_or_none),
+    ('away_ot1', 'BJ', to_int_or_none),
+    ('away_ot2', 'BL', to_int_or_none),
+    ('home_logo', 'OA', None),
+    ('away_logo', 'OB', None),
+)
+
 def get_url_by_date(date: date):
     offset = get_offset_by_date(date)
     return f"https://2.flashscore.ninja/2/x/feed/f_3_{offset}_2_en_1"
@@ -45,102 +112,134 @@ def scrape_basket_results(
     session_manager: SessionManager,
     url: str,
     prefix: str,
-    out_folder: str
-):
-    X_FSIGN_HEADER = {"X-Fsign": "SW9D1eZo"}
+    out_folder: str,
+    debug_dump: bool = False
+) -> str | None:
+    """
+    Загружает ленту результатов и возвращает её текст для convert_to_raw_json.
+    
+    С debug_dump=True лента также сохраняется в {prefix}.raw.txt
+    (одна запись на строку), как раньше.
+    
+    Returns:
+        str: Текст ленты (записи разделены '¬') или None, если все прокси закончились
+    """
     out_file = f"{out_folder}/{prefix}.raw.txt"
+    text = None
 
     try:
-        logger.info(f"--- Starting to extract basketball data for {prefix}... ---")
+        logger.info("--- Starting to extract basketball data for %s... ---", prefix)
         session_manager.apply_delay()
         response = session_manager.fetch_with_retry(
             'GET', 
             url, 
-            headers=dict(X_FSIGN_HEADER)
+            headers=X_FSIGN_HEADER
         )
         # print(response.text[:1000])  # Первые 1000 символов
+        # Лента в UTF-8: без определения кодировки по всему ответу
+        text = get_decoded_text(response)
 
-        lst = response.text.split('¬')
-
-        with open(out_file, 'w', encoding='utf-8') as f:
-            for el in lst:
-                f.write(el + '\n')
+        if debug_dump:
+            # Одна запись ленты на строку - байты ответа как есть, без перекодирования
+            Path(out_file).write_bytes(response.content.replace('¬'.encode(), b'\n') + b'\n')
 
     except RuntimeError as e:
         # Эта ошибка возникнет, только если все прокси закончились
         print(f"Critical error: {e}. Execution aborted.")
 
-    logger.info(f"--- Basketball data for {prefix} successfully extracted. ---")
-    logger.info(f"--- All the data for {prefix} saved to ${out_file}. ---")
+    logger.info("--- Basketball data for %s successfully extracted. ---", prefix)
+    if debug_dump:
+        logger.info("--- All the data for %s saved to $%s. ---", prefix, out_file)
 
-def convert_to_raw_json(
-        prefix: str,
-        folder_in: str,
-        folder_out: str
-    )->None:
+    return text
 
-    file_in = f"{folder_in}/{prefix}.raw.txt"
-    file_out = f"{folder_out}/{prefix}.raw.json"
-
-    if not os.path.exists(file_in):
-        raise FileNotFoundError(f"Scraped data file not found: {file_in}")
-    
+def parse_raw_feed(text: str) -> list[dict]:
+    """
+    Разбирает ленту результатов (одна запись "ключ÷значение" на строку)
+    в список турниров с результатами - содержимое {prefix}.raw.json.
+    """
     tournaments = []
     current_tournament = {}
     current_result = {}
 
-    logger.info(f"--- Starting to convert scraped basketball data for {prefix} to raw json... ---")
-
-    with open(file_in, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            if '÷' not in line:
-                continue
+    results = None
+    for tilde, key, value in FEED_LINE_RE.findall(text):
+        # Границы записей отмечены одним '~' (~ZA÷..., ~AA÷...)
+        if tilde == '~':
             # --- Ключ нового турнира (например, ~ZA÷AFRICA) ---
-            if line.startswith('~ZA'):
+            if key.startswith('ZA'):
                 # Сохраняем предыдущий турнир, если он был
                 if current_tournament:
                     if current_result:
-                        current_tournament.setdefault("results", []).append(current_result)
+                        if results is None:
+                            results = current_tournament["results"] = []
+                        results.append(current_result)
                         current_result = {}
                     tournaments.append(current_tournament)
                     current_tournament = {}
-            key = line.split('÷')[0].lstrip('~')
-            if key in (
-                'ZA', 'ZEE', 'ZB', 'ZY', 'ZC', 'ZD', 'ZE', 'ZF',
-                'ZO', 'ZG', 'ZH', 'ZJ', 'ZL', 'OAJ', 'ZX', 'ZCC',
-                'TSS', 'ZAF', 'ZK', 'ZAC'
-            ):
-                value = line.split('÷')[1]
-                current_tournament[key] = value
-            # --- Ключ нового результата (например, ~ZA÷AFRICA) ---
-            if line.startswith('~AA'):
+                    results = None
+            # --- Ключ нового результата (например, ~AA÷...) ---
+            elif key.startswith('AA'):
                 # Сохраняем предыдущий результат, если он был
                 if current_result:
-                    current_tournament.setdefault("results", []).append(current_result)
+                    if results is None:
+                        results = current_tournament["results"] = []
+                    results.append(current_result)
                     current_result = {}
-            key = line.split('÷')[0].lstrip('~')
-            if key not in (
-                'ZA', 'ZEE', 'ZB', 'ZY', 'ZC', 'ZD', 'ZE', 'ZF',
-                'ZO', 'ZG', 'ZH', 'ZJ', 'ZL', 'OAJ', 'ZX', 'ZCC',
-                'TSS', 'ZAF', 'SA', 'ZK', 'ZAC'
-            ):
-                value = line.split('÷')[1]
-                current_result[key] = value
+        if key in TOURNAMENT_KEYS:
+            current_tournament[key] = value
+        elif key not in NON_RESULT_KEYS:
+            current_result[key] = value
 
     # Сохраняем предыдущий турнир, если он был
     if current_tournament:
         if current_result:
-            current_tournament.setdefault("results", []).append(current_result)
+            if results is None:
+                results = current_tournament["results"] = []
+            results.append(current_result)
         tournaments.append(current_tournament)
 
-    with open(file_out, "w", encoding="utf-8") as f:
-        json.dump(tournaments, f, ensure_ascii=False, indent=4)
+    return tournaments
+
+def convert_to_raw_json(
+        prefix: str,
+        folder_in: str,
+        folder_out: str,
+        text: str | None = None
+    )->None:
+    """
+    Собирает {prefix}.raw.json из ленты результатов.
+    
+    Лента берётся из text (результат scrape_basket_results), а если он
+    не передан - из файла {prefix}.raw.txt в folder_in. Этот файл пишется
+    только с debug_dump=True, поэтому конвейер всегда передаёт text
+    (см. convert_feed).
+    """
+
+    file_in = f"{folder_in}/{prefix}.raw.txt"
+    file_out = f"{folder_out}/{prefix}.raw.json"
+
+    if text is None:
+        if not os.path.exists(file_in):
+            raise FileNotFoundError(f"Scraped data file not found: {file_in}")
 
-    logger.info(f"--- Scraped basketball data for {prefix} successfully converted to raw json... ---")
-    logger.info(f"--- Raw json data saved to {file_out}. ---")
+        with open(file_in, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        # Записи ленты -> строки, как в .raw.txt, прочитанном в текстовом режиме
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        text = text.replace('¬', '\n')
+    
+    logger.info("--- Starting to convert scraped basketball data for %s to raw json... ---", prefix)
+
+    tournaments = parse_raw_feed(text)
+
+    # Компактный вывод: файл читает только convert_to_nice_json
+    Path(file_out).write_bytes(orjson.dumps(tournaments))
+
+    logger.info("--- Scraped basketball data for %s successfully converted to raw json... ---", prefix)
+    logger.info("--- Raw json data saved to %s. ---", file_out)
 
 def convert_to_nice_json(
         prefix: str,
@@ -154,61 +253,52 @@ def convert_to_nice_json(
     if not os.path.exists(file_in):
         raise FileNotFoundError(f"Raw json data file not found: {file_in}")
     
-    logger.info(f"--- Starting to convert raw json data for {prefix} to nice json... ---")
+    logger.info("--- Starting to convert raw json data for %s to nice json... ---", prefix)
 
     nice_list = []
 
     # Открываем файл и загружаем JSON-данные
-    with open(file_in, "r", encoding="utf-8") as f:
-        data = json.load(f)
-        for raw in data:
-            nice = {}
-            nice['area_src_id'] = raw.get('ZB')
-            nice['area_name'] = raw.get('ZY')
-            nice['tourney_src_id'] = raw.get('ZEE')
-            nice['tourney_name'] = raw.get('ZA')
-            nice['tourney_code'] = raw.get('ZAC')
-            nice['tourney_url'] = raw.get('ZL')
-            nice['tourney_logo'] = raw.get('OAJ')
-            nice['tourney_status'] = raw.get('ZCC')
-            nice['results'] = []
-            for raw_res in raw['results']:
-                nice_res = {}
-                nice_res['game_src_id'] = raw_res.get('AA')
-                nice_res['game_ts'] = to_int_or_none(raw_res.get('AD'))
-                if raw_res.get('AC') == '10':
-                    nice_res['game_end'] = 'overtime'
-                else:
-                    nice_res['game_end'] = 'standard'
-                nice_res['home_src_id'] = raw_res.get('PX')
-                nice_res['away_src_id'] = raw_res.get('PY')
-                nice_res['home_name'] = raw_res.get('AE')
-                nice_res['away_name'] = raw_res.get('AF')
-                nice_res['home_slug'] = raw_res.get('WU')
-                nice_res['away_slug'] = raw_res.get('WV')
-                nice_res['home_abbr'] = raw_res.get('WM')
-                nice_res['away_abbr'] = raw_res.get('WN')
-                nice_res['home_score'] = to_int_or_none(raw_res.get('AG'))
-                nice_res['away_score'] = to_int_or_none(raw_res.get('AH'))
-                nice_res['home_q1'] = to_int_or_none(raw_res.get('BA'))
-                nice_res['home_q2'] = to_int_or_none(raw_res.get('BC'))
-                nice_res['home_q3'] = to_int_or_none(raw_res.get('BE'))
-                nice_res['home_q4'] = to_int_or_none(raw_res.get('BG'))
-                nice_res['home_ot1'] = to_int_or_none(raw_res.get('BI'))
-                nice_res['home_ot2'] = to_int_or_none(raw_res.get('BK'))
-                nice_res['away_q1'] = to_int_or_none(raw_res.get('BB'))
-                nice_res['away_q2'] = to_int_or_none(raw_res.get('BD'))
-                nice_res['away_q3'] = to_int_or_none(raw_res.get('BF'))
-                nice_res['away_q4'] = to_int_or_none(raw_res.get('BH'))
-                nice_res['away_ot1'] = to_int_or_none(raw_res.get('BJ'))
-                nice_res['away_ot2'] = to_int_or_none(raw_res.get('BL'))
-                nice_res['home_logo'] = raw_res.get('OA')
-                nice_res['away_logo'] = raw_res.get('OB')
-                nice['results'].append(nice_res)
-            nice_list.append(nice)
-
-    with open(file_out, "w", encoding="utf-8") as f:
-        json.dump(nice_list, f, ensure_ascii=False, indent=4)
-
-    logger.info(f"--- Raw json data for {prefix} successfully converted to nice json... ---")
-    logger.info(f"--- Nice json data saved to {file_out}. ---")
\ No newline at end of file
+    data = orjson.loads(Path(file_in).read_bytes())
+    for raw in data:
+        nice = {dst: raw.get(src) for dst, src in NICE_TOURNAMENT_FIELDS}
+        nice['results'] = [
+            {
+                dst: raw_res.get(src) if convert is None else convert(raw_res.get(src))
+                for dst, src, convert in NICE_RESULT_FIELDS
+            }
+            for raw_res in raw['results']
+        ]
+        nice_list.append(nice)
+
+    # Компактный вывод: файл читает только загрузчик (load_to_db)
+    Path(file_out).write_bytes(orjson.dumps(nice_list))
+
+    logger.info("--- Raw json data for %s successfully converted to nice json... ---", prefix)
+    logger.info("--- Nice json data saved to %s. ---", file_out)
+
+def convert_feed(
+        prefix: str,
+        raw_folder: str,
+        upload_folder: str,
+        text: str
+)->None:
+    """
+    Конвертирует ленту в raw json, а затем в nice json для загрузки в БД.
+    
+    text обязателен: без него convert_to_raw_json прочитал бы {prefix}.raw.txt,
+    который мог остаться от прошлого запуска.
+    
+    Функция верхнего уровня модуля, чтобы её можно было выполнять
+    в ProcessPoolExecutor (конвертация нагружает только CPU).
+    """
+    convert_to_raw_json(
+        prefix=prefix,
+        folder_in=raw_folder,
+        folder_out=raw_folder,
+        text=text
+    )
+    convert_to_nice_json(
+        prefix=prefix,
+        folder_in=raw_folder,
+        folder_out=upload_folder
+    )
@@ -1,5 +1,7 @@
 # utils/header_provider.py
 
+import random
+
 from browserforge.headers import HeaderGenerator
 
 class HeaderProvider:
@@ -7,13 +9,19 @@ class HeaderProvider:
     Provides a complete and highly realistic set of browser headers
     using the browserforge library.
     """
+    # Number of header sets generated up front
+    POOL_SIZE = 64
+
     def __init__(self):
         # Use HeaderGenerator
         self.generator = HeaderGenerator()
+        # Sample the generator once, not per request: requests (and proxy
+        # checks running on many threads) pick from this pool instead
+        self._pool = [self.generator.generate() for _ in range(self.POOL_SIZE)]
 
     def get_random_header(self) -> dict[str, str]:
         """
-        Generates and returns a complete set of random browser headers.
+        Returns a random set of browser headers from the pre-generated pool.
+        The returned dict is a copy and can be modified by the caller.
         """
-        # Call the generate() method on our instance
-        return self.generator.generate()
\ No newline at end of file
+        return dict(random.choice(self._pool))
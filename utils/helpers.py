@@ -1,12 +1,4 @@
 import requests
-import brotli
-import gzip
-import zlib
-
-import requests
-import brotli
-import gzip
-import zlib
 
 from pathlib import Path
 from typing import Any
@@ -16,7 +8,11 @@ import shutil
 
 def get_decoded_text(response: requests.Response) -> str:
     """
-    Decodes response content using headers for encoding and charset.
+    Decodes response content using the charset from the Content-Type header.
+    
+    requests already decompresses gzip/deflate (and br, as brotli is installed)
+    and decodes with the header charset, replacing invalid bytes. Without a
+    charset in the header, UTF-8 is used.
     
     Args:
         response: The requests.Response object.
@@ -24,36 +20,9 @@ def get_decoded_text(response: requests.Response) -> str:
     Returns:
         A decoded string.
     """
-    content = response.content
-    
-    # 1. Try to decompress if needed (only if content looks compressed)
-    content_encoding = response.headers.get('Content-Encoding', '').lower()
-    
-    if content_encoding in ['br', 'gzip', 'deflate']:
-        try:
-            if content_encoding == 'br':
-                content = brotli.decompress(content)
-            elif content_encoding == 'gzip':
-                content = gzip.decompress(content)
-            elif content_encoding == 'deflate':
-                content = zlib.decompress(content)
-        except Exception:
-            # Content is already decompressed by requests, use as-is
-            pass
-    
-    # 2. Extract charset from Content-Type header
-    content_type = response.headers.get('Content-Type', '')
-    charset = 'utf-8'  # default
-    
-    if 'charset=' in content_type:
-        charset = content_type.split('charset=')[-1].split(';')[0].strip()
-    
-    # 3. Decode using the specified charset
-    try:
-        return content.decode(charset)
-    except (UnicodeDecodeError, LookupError):
-        # Fallback to UTF-8 with error replacement
-        return content.decode('utf-8', errors='replace')
+    if 'charset=' not in response.headers.get('Content-Type', ''):
+        response.encoding = 'utf-8'
+    return response.text
     
 def parse_flashscore_response_file(file_path: Path) -> dict[str, Any]:
     pass
@@ -3,19 +3,25 @@
 # https://free-proxy-list.net/ru/ssl-proxy.html
 
 import logging
-import queue
 import random
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import requests
 
-from config import settings
+from config import get_settings
 from .header_provider import HeaderProvider
 
 # Get a logger instance for this module
 logger = logging.getLogger(__name__)
 
+
+def _proxy_dict(proxy: str) -> dict[str, str]:
+    """requests proxies dict for an "ip:port" proxy (a new dict: requests may modify it)."""
+    return {"http": f"http://{proxy}", "https": f"http://{proxy}"}
+
+
 class ProxyProvider:
     """
     Manages a pool of valid proxies by accumulating and re-validating them.
@@ -23,10 +29,14 @@ class ProxyProvider:
     """
     def __init__(self):
         # Access to proxy settings is now done through the nested settings.proxy object
-        self.config = settings.proxy
+        self.config = get_settings().proxy
         self.valid_proxies: set[str] = set()
-        self._proxy_queue = queue.Queue()
-        self._validation_threads = 10
+        # valid_proxies as a list for random.choice, rebuilt after validation
+        self._valid_list: list[str] = []
+        # Proxy checks are I/O-bound: one thread per proxy, up to this limit
+        self._max_validation_threads = 128
+        # Guards valid_proxies/_valid_list: scraping threads pick and drop proxies concurrently
+        self._lock = threading.Lock()
         
         # Initialize the header provider
         self.header_provider = HeaderProvider()
@@ -43,24 +53,27 @@ class ProxyProvider:
         # 2. Load and validate the new proxy list
         self._validate_new_proxies()
         
+        with self._lock:
+            self._valid_list = list(self.valid_proxies)
+        
         # 3. Save the updated list of valid proxies
         self._save_valid_proxies()
 
-        logger.info(f"ProxyProvider: Work complete. {len(self.valid_proxies)} valid proxies in the pool.")
+        logger.info("ProxyProvider: Work complete. %s valid proxies in the pool.", len(self.valid_proxies))
 
     def _load_proxies_from_file(self, file_path: Path) -> list[str]:
         """Generic method to load proxies from a given file."""
         if not file_path.exists():
-            logger.info(f"ProxyProvider: File {file_path.name} not found. Skipping.")
+            logger.info("ProxyProvider: File %s not found. Skipping.", file_path.name)
             return []
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 proxies = [line.strip() for line in f.readlines() if line.strip()]
-            logger.info(f"ProxyProvider: Loaded {len(proxies)} proxies from {file_path.name}.")
+            logger.info("ProxyProvider: Loaded %s proxies from %s.", len(proxies), file_path.name)
             return proxies
         except Exception as e:
-            logger.error(f"ProxyProvider: Error reading {file_path.name}: {e}")
+            logger.error("ProxyProvider: Error reading %s: %s", file_path.name, e)
             return []
 
     def _revalidate_existing_proxies(self) -> None:
@@ -75,7 +88,7 @@ class ProxyProvider:
         # Assign the result of re-validation back to our main set,
         # to avoid losing working proxies from previous runs.
         self.valid_proxies = self._run_validation(existing_proxies)
-        logger.info(f"ProxyProvider: Re-validation complete. {len(self.valid_proxies)} working proxies remain.")
+        logger.info("ProxyProvider: Re-validation complete. %s working proxies remain.", len(self.valid_proxies))
 
     def _validate_new_proxies(self) -> None:
         """Step 2: Validate new proxies from proxies.txt."""
@@ -90,49 +103,44 @@ class ProxyProvider:
             logger.info("ProxyProvider: All new proxies are already in the valid pool.")
             return
 
-        logger.info(f"ProxyProvider: Checking {len(proxies_to_check)} new proxies...")
+        logger.info("ProxyProvider: Checking %s new proxies...", len(proxies_to_check))
         new_valid_proxies = self._run_validation(proxies_to_check)
         self.valid_proxies.update(new_valid_proxies)
-        logger.info(f"ProxyProvider: Found {len(new_valid_proxies)} new working proxies.")
+        logger.info("ProxyProvider: Found %s new working proxies.", len(new_valid_proxies))
 
     def _run_validation(self, proxy_list: list[str]) -> set[str]:
         """Core validation logic that runs in threads."""
-        found_valid_proxies: set[str] = set()
+        if not proxy_list:
+            return set()
         
-        for proxy in proxy_list:
-            self._proxy_queue.put(proxy)
-        
-        threads = []
-        for _ in range(self._validation_threads):
-            # Create a thread that will update our shared set
-            thread = threading.Thread(target=self._validate_proxy_worker, args=(found_valid_proxies,), daemon=True)
-            thread.start()
-            threads.append(thread)
-        
-        self._proxy_queue.join()
-        return found_valid_proxies
-
-    def _validate_proxy_worker(self, valid_set: set[str]) -> None:
-        """Worker function for threads that adds found proxies to the provided set."""
-        while not self._proxy_queue.empty():
-            proxy = self._proxy_queue.get()
-            try:
-                proxies = {"http": f"http://{proxy}", "https": f"http://{proxy}"}
-                headers = self.header_provider.get_random_header()
-                
-                response = requests.get(
-                    self.config.validity_check_url, 
-                    proxies=proxies, 
-                    headers=headers, 
-                    timeout=5
-                )
+        max_workers = min(len(proxy_list), self._max_validation_threads)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Each check returns its own result: no set shared between threads
+            return {proxy for proxy in executor.map(self._check_proxy, proxy_list) if proxy}
+
+    def _check_proxy(self, proxy: str) -> str | None:
+        """Worker function for threads: returns the proxy if it works, else None."""
+        try:
+            proxies = _proxy_dict(proxy)
+            headers = self.header_provider.get_random_header()
+            
+            # Only the status matters: stream=True skips the body download, the
+            # response is closed unread. Separate (connect, read) timeouts let
+            # dead proxies fail fast. A connection is never reused (every check
+            # goes through another proxy), so no session is kept
+            with requests.get(
+                self.config.validity_check_url, 
+                proxies=proxies, 
+                headers=headers, 
+                timeout=(3, 2),
+                stream=True
+            ) as response:
                 if response.status_code == 200:
-                    valid_set.add(proxy)
-            except Exception:
-                # Proxy failed the check, ignore
-                pass
-            finally:
-                self._proxy_queue.task_done()
+                    return proxy
+        except Exception:
+            # Proxy failed the check, ignore
+            pass
+        return None
 
     def _save_valid_proxies(self) -> None:
         """Step 3: Save accumulated valid proxies to file."""
@@ -142,21 +150,21 @@ class ProxyProvider:
 
         try:
             with open(self.config.valid_proxies_file_path, 'w', encoding='utf-8') as f:
-                # Save a sorted list for file cleanliness
-                for proxy in sorted(list(self.valid_proxies)):
-                    f.write(proxy + '\n')
-            logger.info(f"ProxyProvider: Saved {len(self.valid_proxies)} proxies to {self.config.valid_proxies_file_path.name}.")
+                # Save a sorted list for file cleanliness, one proxy per line, in one write
+                f.write('\n'.join(sorted(self.valid_proxies)) + '\n')
+            logger.info("ProxyProvider: Saved %s proxies to %s.", len(self.valid_proxies), self.config.valid_proxies_file_path.name)
         except Exception as e:
-            logger.error(f"ProxyProvider: Error saving valid proxies: {e}")
+            logger.error("ProxyProvider: Error saving valid proxies: %s", e)
     
 
     def get_random_proxy(self) -> dict[str, str] | None:
         """Returns a random valid proxy."""
-        if not self.valid_proxies:
-            return None
-        
-        proxy = random.choice(list(self.valid_proxies))
-        return {"http": f"http://{proxy}", "https": f"http://{proxy}"}
+        with self._lock:
+            if not self._valid_list:
+                return None
+            
+            proxy = random.choice(self._valid_list)
+        return _proxy_dict(proxy)
 
     def mark_proxy_as_bad(self, proxy_dict: dict[str, str]) -> None:
         """Removes a bad proxy from the valid pool."""
@@ -166,7 +174,12 @@ class ProxyProvider:
         # Extract IP:PORT from a string like "http://ip:port"
         proxy_address = proxy_dict['http'].replace("http://", "")
         
-        if proxy_address in self.valid_proxies:
+        with self._lock:
+            if proxy_address not in self.valid_proxies:
+                return
             self.valid_proxies.remove(proxy_address)
-            logger.info(f"ProxyProvider: Proxy {proxy_address} marked as bad and removed from the pool.")
-            logger.info(f"ProxyProvider: {len(self.valid_proxies)} proxies left in the pool.")
\ No newline at end of file
+            self._valid_list.remove(proxy_address)
+            proxies_left = len(self.valid_proxies)
+        
+        logger.info("ProxyProvider: Proxy %s marked as bad and removed from the pool.", proxy_address)
+        logger.info("ProxyProvider: %s proxies left in the pool.", proxies_left)
\ No newline at end of file
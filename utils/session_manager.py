@@ -2,13 +2,15 @@
 
 import logging
 import random
+import threading
 import time
 from typing import Callable
 
 import requests
+from requests.adapters import HTTPAdapter
 
 # Предполагается, что эти файлы существуют и настроены
-# from config import settings
+# from config import get_settings
 from .header_provider import HeaderProvider
 from .proxy_provider import ProxyProvider
 
@@ -17,12 +19,19 @@ logger = logging.getLogger(__name__)
 
 class SessionManager:
     """
-    Creates and manages a requests.Session with rotating headers and a smart retry mechanism.
+    Manages requests.Sessions (one per proxy) with rotating headers and proxies and a smart retry mechanism.
     """
+    # Connections kept per host through one proxy; at least the number of concurrent scraping threads
+    POOL_SIZE = 20
+
     def __init__(self, max_retries: int = 3):
         self.header_provider = HeaderProvider()
         self.proxy_provider = ProxyProvider()
         self.max_retries = max_retries
+        # One session per proxy URL ('' - no proxy): connections are reused,
+        # cookies set for one proxy IP are never sent through another
+        self._sessions: dict[str, requests.Session] = {}
+        self._session_lock = threading.Lock()
         
         logger.info("SessionManager: Initializing proxy provider...")
         self.proxy_provider.initialize()
@@ -32,26 +41,45 @@ class SessionManager:
             logger.critical("SessionManager: Script execution stopped to prevent real IP address leak.")
             raise RuntimeError("No valid proxies found. Operation cannot continue.")
         
-        logger.info(f"SessionManager: Initialization complete. {len(self.proxy_provider.valid_proxies)} proxies in the pool.")
+        logger.info("SessionManager: Initialization complete. %s proxies in the pool.", len(self.proxy_provider.valid_proxies))
 
-    def get_session(self) -> requests.Session:
-        """
-        Creates a new session configured with a random header and a proxy.
+    def get_session(self, proxy_url: str | None = None) -> requests.Session:
         """
-        session = requests.Session()
-        headers = self.header_provider.get_random_header()
-        session.headers.update(headers)
-        
-        proxy = self.proxy_provider.get_random_proxy()
-        if proxy:
-            session.proxies.update(proxy)
+        Returns the session of a proxy, creating it on first use.
         
+        Headers are chosen per request (see fetch_with_retry); requests
+        through the same proxy keep their connections alive in its session.
+        """
+        key = proxy_url or ''
+        session = self._sessions.get(key)
+        if session is None:
+            with self._session_lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._sessions[key] = session
         return session
 
+    def close_session(self, proxy_url: str) -> None:
+        """
+        Closes and forgets the session of a proxy.
+        
+        A proxy marked as bad is never picked again, so its session would
+        only hold dead connections for the rest of the run. A request still
+        running in it fails with a ConnectionError and is retried.
+        """
+        with self._session_lock:
+            session = self._sessions.pop(proxy_url, None)
+        if session is not None:
+            session.close()
+
     def apply_delay(self, min_delay: float = 1.0, max_delay: float = 3.0) -> None:
         """Applies a random delay to mimic human behavior."""
         delay = random.uniform(min_delay, max_delay)
-        logger.info(f"Applying a delay of {delay:.2f} seconds...")
+        logger.info("Applying a delay of %.2f seconds...", delay)
         time.sleep(delay)
 
     def fetch_with_retry(self, method: str, url: str, **kwargs) -> requests.Response:
@@ -60,23 +88,29 @@ class SessionManager:
         """
         last_exception = None
         
+        request_headers = kwargs.pop('headers', None) or {}
+        
         for attempt in range(self.max_retries):
-            session = self.get_session()
-            current_proxy = session.proxies.get('http')
+            # A random header and proxy for every attempt
+            headers = {**self.header_provider.get_random_header(), **request_headers}
+            proxies = self.proxy_provider.get_random_proxy() or {}
+            current_proxy = proxies.get('http')
+            session = self.get_session(current_proxy)
 
             try:
-                response = session.request(method, url, timeout=30, **kwargs)
+                response = session.request(method, url, headers=headers, proxies=proxies, timeout=30, **kwargs)
                 response.raise_for_status()  # Raises an exception for 4xx/5xx status codes
 
                 # --- НОВАЯ ПРОВЕРКА ---
                 # Проверяем, не является ли ответ пустым (или содержащим только пробелы).
-                if not response.text.strip():
+                # По байтам: текст декодирует вызывающий код (get_decoded_text)
+                if not response.content.strip():
                     # Если ответ пустой, считаем это ошибкой соединения и инициируем повтор.
                     # Это позволит попробовать другой прокси.
                     raise requests.exceptions.ConnectionError("Received an empty response body. Retrying with a different proxy.")
 
                 # Если все проверки пройдены, считаем запрос успешным
-                logger.info(f"✅ Request successful with proxy {current_proxy}.")
+                logger.info("✅ Request successful with proxy %s.", current_proxy)
                 return response
 
             # Обрабатываем ошибки, связанные с прокси и общими проблемами соединения.
@@ -90,13 +124,14 @@ class SessionManager:
                 requests.exceptions.ConnectionError         # <-- Эта ошибка теперь ловится и здесь
             ) as e:
                 last_exception = e
-                logger.warning(f"❌ Connection/Proxy error with {current_proxy}: {type(e).__name__}. Attempt {attempt + 1}/{self.max_retries}.")
+                logger.warning("❌ Connection/Proxy error with %s: %s. Attempt %s/%s.", current_proxy, type(e).__name__, attempt + 1, self.max_retries)
                 if current_proxy:
-                    self.proxy_provider.mark_proxy_as_bad(session.proxies)
+                    self.proxy_provider.mark_proxy_as_bad(proxies)
+                    self.close_session(current_proxy)
             
             # Обрабатываем другие ошибки (например, 404 Not Found), которые не требуют повтора.
             except requests.exceptions.RequestException as e:
-                logger.warning(f"⚠️️ Request error (not retryable): {e}.")
+                logger.warning("⚠️️ Request error (not retryable): %s.", e)
                 raise e
 
         # Если мы здесь, все попытки исчерпаны